@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from flask import Flask, redirect, render_template
+from flask import Flask, redirect, render_template, request
 from src.gitlab_log import GitLabLog as GL
+from src.jira_loader import ISSUE_KEY_PATTERN
 from argparse import ArgumentParser, ArgumentError
+from threading import Lock, Thread
 import git_treasures
 import configparser
+import hmac
 import sys
 import os
 
@@ -56,6 +59,12 @@ db_path = os.path.join(
 app = Flask(__name__)
 app.secret_key = config["flask"]["secret_key"]
 
+# reconciles, full or from a webhook, run one at a time so two of them can't both add the same card
+reconcile_lock = Lock()
+
+# changelog fields that can move a story between Trello lists
+WEBHOOK_FIELDS = ("status", "labels")
+
 
 @app.route("/")
 @app.route("/index.html")
@@ -76,7 +85,8 @@ def home():
 @app.route("/git_treasures")
 def hit_endpoint():
     args = parse_args()
-    git_treasures.main(args)
+    with reconcile_lock:
+        git_treasures.main(args)
 
     return redirect("index.html", code=302)
 
@@ -85,7 +95,8 @@ def hit_endpoint():
 def hit_test_endpoint():
     args = parse_args()
     args.dev = True
-    git_treasures.main(args)
+    with reconcile_lock:
+        git_treasures.main(args)
 
     return redirect("index.html", code=302)
 
@@ -94,7 +105,8 @@ def hit_test_endpoint():
 def hit_testrail_endpoint():
     args = parse_args()
     args.testrail = True
-    git_treasures.main(args)
+    with reconcile_lock:
+        git_treasures.main(args)
 
     return redirect("index.html", code=302)
 
@@ -103,10 +115,44 @@ def hit_testrail_endpoint():
 def hit_testrail_test_endpoint():
     args = parse_args()
     args.testrail = True
-    git_treasures.main(args)
+    with reconcile_lock:
+        git_treasures.main(args)
 
     return redirect("index.html", code=302)
 
 
+def reconcile_story(issue_key):
+    with reconcile_lock:
+        try:
+            git_treasures.reconcile_story(issue_key)
+        except Exception as err:
+            print(f'[!] Webhook reconcile of {issue_key} failed: {err}')
+
+
+@app.route("/jira_webhook", methods=["POST"])
+def jira_webhook():
+    # without a configured secret anyone could trigger Trello writes, so refuse every request
+    secret = config["jira"].get("webhook_secret") if config.has_section("jira") else None
+    if not secret or not hmac.compare_digest(request.args.get("secret", "").encode(), secret.encode()):
+        return "", 403
+
+    event = request.get_json(silent=True) or {}
+    if event.get("webhookEvent") != "jira:issue_updated":
+        return "", 204
+
+    issue_key = event.get("issue", {}).get("key")
+    if not isinstance(issue_key, str) or not ISSUE_KEY_PATTERN.match(issue_key):
+        return "", 400
+
+    # comment and description edits don't change which list the card belongs on
+    items = event.get("changelog", {}).get("items", [])
+    if not any(item.get("field", "").lower() in WEBHOOK_FIELDS for item in items):
+        return "", 204
+
+    # answer right away so Jira doesn't time out and redeliver while the reconcile runs
+    Thread(target=reconcile_story, args=(issue_key,), daemon=True).start()
+    return "", 202
+
+
 if __name__ == "__main__":
     app.run(debug=False)
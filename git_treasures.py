@@ -13,7 +13,7 @@ import time
 import os
 
 
-def main(args):
+def get_config() -> ConfigParser:
     config = ConfigParser()
     try:
         config.read(os.path.join('config', 'config.ini'))
@@ -24,6 +24,11 @@ def main(args):
     db_path = os.path.relpath(os.path.join(config.get('common', 'db_path')))
     if not is_db_init(db_path):
         raise DbException('[!] Database is not initialized. Run init.py in this directory to initialize the commit database, then re-run GitTreasures.')
+    return config
+
+
+def main(args):
+    config = get_config()
 
     print('[+] Initializing GitTreasures')
     start = time.time()
@@ -37,6 +42,10 @@ def main(args):
     trello.populate()
     git.populate()
 
+    # stories long since finished and already on Complete or the archive board can be left out of the Jira queries
+    if jira.done_horizon_days > 0:
+        jira.settle(trello.get_settled_card_names())
+
     print('[+] Starting reconcile process')
     # run the TestRail reconcile process if true
     if args.testrail:
@@ -47,6 +56,30 @@ def main(args):
     # initialize the Trello reconciler
     trello_reconciler = TrelloReconciler(jira, git, trello, config)
     trello_reconciler.reconcile()
+    jira.report_downloads()
+    end = time.time()
+    duration = int(end) - int(start)
+    print(f'[+] Done in {str(duration)}s')
+
+
+def reconcile_story(issue_key: str) -> None:
+    """Reconcile a single Jira story against Trello instead of running the whole reconcile process.
+
+    :param issue_key: a Jira story key
+    """
+    config = get_config()
+
+    print(f'[+] Reconciling {issue_key}')
+    start = time.time()
+    trello = TrelloBoard(config)
+    jira = JiraBoard(config)
+    git = GitLabLog(config)
+    trello.populate()
+    git.populate()
+
+    trello_reconciler = TrelloReconciler(jira, git, trello, config, populate=False)
+    trello_reconciler.reconcile_story(issue_key)
+    jira.report_downloads()
     end = time.time()
     duration = int(end) - int(start)
     print(f'[+] Done in {str(duration)}s')
@@ -1,16 +1,62 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from util import get_configs
+from util import get_configs, parse_jira_date, format_jira_date, iter_json_records
 from src.exceptions import JiraBoardException
+from src.jira_store import JiraIssueStore
+from src.story_timeline import StoryTimeline
+from src.jira_cache import JiraMetadataCache
+from src.jira_loader import JiraIssueLoader, ISSUE_KEY_PATTERN
 from urllib.parse import urljoin
 from jira import JIRA, JIRAError
+from jira.client import ResultList
+from requests.exceptions import ConnectionError, Timeout
 from jira.resources import Filter, Project, Board, Sprint, Issue
-import dateutil.parser
-import json
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, local
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+import random
+import time
 import os
 import re
 
 
+# Union of every field the predicates and get_parsed_stories read, so one fetch answers all of them
+SNAPSHOT_FIELDS = 'summary,description,labels,created,updated,status,statuscategorychangedate,issuetype,attachment,parent'
+
+# Fields the sprint's stories are first listed with, enough to apply status-only filters and the Done horizon locally
+SPRINT_LIST_FIELDS = 'key,status,issuetype,statuscategorychangedate'
+
+# Fields a snapshot keeps once its story is parsed, for the predicates the reconcilers call afterwards
+RETAINED_FIELDS = 'labels,status,statuscategorychangedate,issuetype,parent'
+
+# Fields kept for each child in the parent/children graph
+CHILD_FIELDS = 'parent,summary,status,issuetype'
+
+# Jira caps search pages at 100 issues
+PAGE_SIZE = 100
+
+# A JQL clause that can be checked against a story's fields without asking Jira
+STATUS_CLAUSE = re.compile(r'^status\s*(?:=\s*(?P<one>"[^"]+"|\'[^\']+\'|[\w-]+)|in\s*\((?P<many>[^()]*)\))$', re.IGNORECASE)
+PROJECT_CLAUSE = re.compile(r'^project\s*(?:=\s*(?P<one>"[^"]+"|\'[^\']+\'|[\w-]+)|in\s*\((?P<many>[^()]*)\))$', re.IGNORECASE)
+
+# One quoted or bare value in a JQL list
+JQL_VALUE = re.compile(r'"([^"]*)"|\'([^\']*)\'|([^\s,"\'][^,]*)')
+
+# Jira's bulk create endpoint takes at most 50 issues per request
+BULK_CREATE_SIZE = 50
+
+# Newest comments copied onto a new Trello card
+COMMENT_WINDOW = 20
+
+# Responses worth retrying. Anything else (bad JQL, missing issue, no permission) fails the same way every time
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Issue types that never get their own Trello card
+QA_EXCLUDED_TYPES = ('Defect', 'QA Task')
+
+
 class JiraBoard(object):
 
     def __init__(self, config: dict, userpath: str = None, testMode: bool = False):
@@ -26,19 +72,150 @@ class JiraBoard(object):
             upath = (os.path.relpath(os.path.join('config', userpath)))
         else:
             upath = (os.path.relpath(os.path.join('config', 'users.ini')))
-        self.testers = [t['jira_displayname'] for t in get_configs(['jira_displayname'], upath).values()]
+        self.testers = frozenset(t['jira_displayname'] for t in get_configs(['jira_displayname'], upath).values())
+        # Jira Cloud only accepts account ids in JQL, so testers without one can't be matched by CHANGED ... BY queries
+        self.tester_account_ids = frozenset(filter(None, (t['jira_account_id'].strip() for t in get_configs(['jira_account_id'], upath).values())))
 
         self.host = config.get('url')
         self.username = config.get('username')
         self.password = config.get('token')
         self.project_key = config.get('project_key')
+        self.max_workers = int(config.get('max_workers') or 1)
+        self.max_page_workers = int(config.get('max_page_workers') or 1)
+        self.retry_max_seconds = float(config.get('retry_max_seconds') or 120)
+        self.retry_base_delay = float(config.get('retry_base_delay') or 1)
+        self.comment_window = int(config.get('comment_window') or COMMENT_WINDOW)
+        # raw mode skips building jira.resources objects and works on the decoded JSON directly
+        self.raw_mode = str(config.get('raw_mode') or 'true').lower() in ('true', 'yes', '1')
+        # stories Done for longer than this many days, and already on Trello's Complete or archive lists, are skipped
+        self.done_horizon_days = int(config.get('done_horizon_days') or 0)
+        self.settled_keys = frozenset()
+        # pull the QA filters' stories from the active sprint instead of searching the whole project
+        self.sprint_scoped = str(config.get('sprint_scoped') or 'false').lower() in ('true', 'yes', '1')
         self.testMode = testMode
+        # testMode fixture: a JSON array or one issue per line, optionally gzipped
+        self.fixture_path = config.get('fixture_path') or 'testJiraData.json'
         self.options = {'server': self.host}
-        self.jira = JIRA(self.options, auth=(self.username, self.password))
-        self.board = self.get_board(self.project_key)
-        self.current_sprint = self.get_current_sprint(self.board.id)
+        # retries are handled by call_jira, so turn off the client's own retry loop
+        self.jira = JIRA(self.options, auth=(self.username, self.password), max_retries=0)
         self.raw_issues = []
         self.stories = []
+        self._snapshots = {}
+        self._snapshot_fields = {}
+        self._timelines = {}
+
+        # parent/children graph, built in batches by index_children where children are needed and otherwise by get_children
+        self._children = {}
+        self._parents = {}
+
+        # bytes downloaded per call site, counted by a session hook so report_downloads can show what each call costs
+        self._downloads = {}
+        self._downloads_lock = Lock()
+        self._call_site = local()
+        self.jira._session.hooks['response'].append(self._count_download)
+
+        # persistent issue store, only used when a database path is configured
+        self.store = JiraIssueStore(config.get('db_path')) if config.get('db_path') else None
+
+        # board, sprint, project and filters are resolved on first use and cached on disk
+        self.cache = JiraMetadataCache(
+            config.get('cache_path') or os.path.join('data', 'jira_cache.json'),
+            ttl=int(config.get('cache_ttl') or 3600))
+        self._board = None
+        self._current_sprint = None
+        self._filters = {}
+
+        # batches single-key lookups into 'key in (...)' searches
+        self.loader = JiraIssueLoader(self)
+
+    @property
+    def board(self) -> Board:
+        """The active Jira board, looked up the first time it is needed."""
+        if self._board is None:
+            self._board = self.get_board(self.project_key)
+        return self._board
+
+    @property
+    def current_sprint(self) -> Sprint:
+        """The active sprint on the board, looked up the first time it is needed."""
+        if self._current_sprint is None:
+            self._current_sprint = self.get_current_sprint(self.board.id)
+        return self._current_sprint
+
+    def call_jira(self, what: str, func, *args, idempotent: bool = True, **kwargs):
+        """Call the Jira API, retrying transient failures with exponential backoff and jitter.
+
+        Retry-After and X-RateLimit-Reset headers are honored, and no more than retry_max_seconds is spent waiting in total.
+        Writes (idempotent=False) are only retried when Jira rate limited them, since nothing was done on its end.
+
+        :param what: description of the call for log messages, e.g. 'get Jira issue'
+        :param func: JIRA client method to call
+        :param idempotent: False if repeating the call after a server error could do the work twice
+        :return: whatever func returns, otherwise None once retries are exhausted
+        """
+        deadline = time.monotonic() + self.retry_max_seconds
+        attempt = 0
+        self._call_site.what = what
+        try:
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except (JIRAError, ConnectionError, Timeout) as error:
+                    attempt += 1
+                    delay = self.retry_delay(error, attempt, idempotent)
+                    if delay is None or time.monotonic() + delay > deadline:
+                        print('[!] Failed to {}.'.format(what))
+                        return None
+                    print('[!] Failed to {}.\nRetrying in {:.1f} seconds.'.format(what, delay))
+                    time.sleep(delay)
+        finally:
+            self._call_site.what = None
+
+    def _count_download(self, response, *args, **kwargs) -> None:
+        """Session response hook that adds a response body to the total of the call site that asked for it."""
+        site = getattr(self._call_site, 'what', None) or 'other'
+        with self._downloads_lock:
+            calls, size = self._downloads.get(site, (0, 0))
+            self._downloads[site] = (calls + 1, size + len(response.content))
+
+    def report_downloads(self) -> None:
+        """Print how many bytes each Jira call site downloaded this run, largest first."""
+        if len(self._downloads) == 0:
+            return
+        print('[+] Jira bytes downloaded per call site:')
+        for site, (calls, size) in sorted(self._downloads.items(), key=lambda d: d[1][1], reverse=True):
+            print('\t{}: {:,} bytes over {} calls'.format(site, size, calls))
+
+    def retry_delay(self, error: Exception, attempt: int, idempotent: bool = True) -> float or None:
+        """Work out how long to wait before retrying a failed Jira call.
+
+        :param error: the exception raised by the call
+        :param attempt: number of attempts made so far
+        :param idempotent: False if the call should only be retried when rate limited
+        :return: seconds to wait, otherwise None if the call should not be retried
+        """
+        status_code = getattr(error, 'status_code', None)
+        if isinstance(error, JIRAError) and status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        if not idempotent and status_code != 429:
+            return None
+
+        # full jitter keeps parallel workers from retrying in lockstep
+        delay = random.uniform(0, min(60, self.retry_base_delay * 2 ** attempt))
+
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        retry_after = headers.get('Retry-After')
+        reset = headers.get('X-RateLimit-Reset')
+        try:
+            if retry_after is not None and retry_after.strip().isdigit():
+                delay = max(delay, float(retry_after))
+            elif retry_after is not None or reset is not None:
+                # an HTTP date in Retry-After, or the ISO timestamp Jira Cloud sends in X-RateLimit-Reset
+                delay = max(delay, parse_jira_date(retry_after or reset).timestamp() - time.time())
+        except (ValueError, OverflowError):
+            pass
+        return delay
 
     def add_new_filter(self, filter_name: str, new_query: str) -> Filter:
         """Add a new JQL filter to the Jira project.
@@ -47,17 +224,7 @@ class JiraBoard(object):
         :param new_query: filter criteria in the form of a JQL string.
         :return:
         """
-        result = None
-        try:
-            result = self.jira.create_filter(filter_name, jql=new_query)
-        except JIRAError:
-            print('[!] Failed to get Jira stories.\nRetrying in a few seconds.')
-            try:
-                result = self.jira.create_filter(filter_name, jql=new_query)
-            except JIRAError:
-                print('[!] Failed to get Jira stories.')
-        finally:
-            return result
+        return self.call_jira('create Jira filter', self.jira.create_filter, filter_name, jql=new_query, idempotent=False)
 
     def update_filter(self, filter_id: int, new_query: str) -> Filter:
         """Update an existing JQL filter associated with the Jira project.
@@ -66,34 +233,24 @@ class JiraBoard(object):
         :param new_query: filter criteria in the form of a JQL string.
         :return:
         """
-        result = None
-        try:
-            result = self.jira.update_filter(filter_id, jql=new_query)
-        except JIRAError:
-            print('[!] Failed to update Jira filter.\nRetrying in a few seconds.'.format(str(JIRAError)))
-            try:
-                result = self.jira.update_filter(filter_id, jql=new_query)
-            except JIRAError:
-                print('[!] Failed to update Jira filter.'.format(str(JIRAError)))
-        finally:
-            return result
+        self._filters.pop(filter_id, None)
+        self.cache.set('filter:{}'.format(filter_id), None)
+        return self.call_jira('update Jira filter', self.jira.update_filter, filter_id, jql=new_query, idempotent=False)
 
     def get_project(self) -> Project:
         """Get active Jira project.
 
         :return: JSON object representing entire Jira project, otherwise None
         """
-        projects = None
-        try:
-            projects = self.jira.projects()
-        except JIRAError:
-            print('[!] Failed to get Jira projects.\nRetrying in a few seconds.'.format(str(JIRAError)))
-            try:
-                projects = self.jira.projects()
-            except JIRAError:
-                print('[!] Failed to get Jira projects.'.format(str(JIRAError)))
-        finally:
-            return next(filter(lambda proj: proj.key.upper() == self.project_key, projects), None)
+        cache_key = 'project:{}'.format(self.project_key)
+        raw = self.cache.get(cache_key)
+        if raw is not None:
+            return Project(self.jira._options, self.jira._session, raw=raw)
+
+        project = self.call_jira('get Jira project', self.jira.project, self.project_key)
+        if project is not None:
+            self.cache.set(cache_key, project.raw)
+        return project
 
     def get_board(self, project_key: str) -> Board:
         """Get active Jira board given a project_key.
@@ -101,17 +258,16 @@ class JiraBoard(object):
         :param project_key: Jira project key
         :return: JSON object representing entire Jira board, otherwise None
         """
-        boards = None
-        try:
-            boards = self.jira.boards(project_key)
-        except JIRAError:
-            print('[!] Failed to get Jira projects.\nRetrying in a few seconds.'.format(str(JIRAError)))
-            try:
-                boards = self.jira.boards(project_key)
-            except JIRAError:
-                print('[!] Failed to get Jira projects.'.format(str(JIRAError)))
-        finally:
-            return next(filter(lambda board: board.name.lower() == 'medhub development', boards), None)
+        cache_key = 'board:{}'.format(project_key)
+        raw = self.cache.get(cache_key)
+        if raw is not None:
+            return Board(self.jira._options, self.jira._session, raw=raw)
+
+        boards = self.call_jira('get Jira boards', self.jira.boards, name='medhub development')
+        board = next(filter(lambda board: board.name.lower() == 'medhub development', boards or []), None)
+        if board is not None:
+            self.cache.set(cache_key, board.raw)
+        return board
 
     def get_current_sprint(self, board_id: int) -> Sprint:
         """Given a board_id, get the current sprint the project is in. Also try and filter out that Moodle shit.
@@ -119,94 +275,772 @@ class JiraBoard(object):
         :param board_id: ID for the current Jira board
         :return:
         """
-        sprints = None
-        try:
-            sprints = self.jira.sprints(board_id)
-        except JIRAError:
-            print('[!] Failed to get Jira sprints.\nRetrying in a few seconds.'.format(str(JIRAError)))
-            try:
-                sprints = self.jira.sprints(board_id)
-            except JIRAError:
-                print('[!] Failed to get Jira sprints.'.format(str(JIRAError)))
-        finally:
-            res = next(filter(lambda story: story.state.lower() == 'active' and 'yaks' in story.name.lower(), sprints), None)
-            if res is None:
-                raise JiraBoardException('[!] No current sprint')
-            return res
+        cache_key = 'sprint:{}'.format(board_id)
+        raw = self.cache.get(cache_key)
+        if raw is not None:
+            return Sprint(self.jira._options, self.jira._session, raw=raw)
+
+        sprints = self.call_jira('get Jira sprints', self.jira.sprints, board_id, state='active')
+        res = next(filter(lambda story: story.state.lower() == 'active' and 'yaks' in story.name.lower(), sprints or []), None)
+        if res is None:
+            raise JiraBoardException('[!] No current sprint')
+        self.cache.set(cache_key, res.raw)
+        return res
 
     def get_jql_filter(self, filter_id: int) -> Filter:
-        j_filter = None
-        try:
-            j_filter = self.jira.filter(filter_id)
-        except JIRAError:
-            print('[!] Failed to get Jira filter.\nRetrying in a few seconds.'.format(str(JIRAError)))
-            try:
-                j_filter = self.jira.filter(filter_id)
-            except JIRAError:
-                print('[!] Failed to get Jira filter.'.format(str(JIRAError)))
-        finally:
+        if filter_id in self._filters:
+            return self._filters[filter_id]
+
+        cache_key = 'filter:{}'.format(filter_id)
+        raw = self.cache.get(cache_key)
+        if raw is not None:
+            j_filter = Filter(self.jira._options, self.jira._session, raw=raw)
+            self._filters[filter_id] = j_filter
             return j_filter
 
-    def get_issues_from_filter(self, filter_id: int) -> list:
+        j_filter = self.call_jira('get Jira filter', self.jira.filter, filter_id)
+        if j_filter is not None:
+            self._filters[filter_id] = j_filter
+            self.cache.set(cache_key, j_filter.raw)
+        return j_filter
+
+    def search_page(self, jql: str, start_at: int = 0, page_size: int = PAGE_SIZE, hydrate: bool = False, fields: str = None, expand: str = None,
+                    what: str = 'search Jira issues', validate_query: bool = True) -> list:
+        """Get a single page of Jira issues for a JQL query.
+
+        :param jql: JQL query string
+        :param start_at: index of the first issue to return
+        :param page_size: maximum number of issues on the page
+        :param hydrate: if True, ask the search for SNAPSHOT_FIELDS and the changelog and seed the snapshot cache with the results
+        :param fields: comma-separated fields to return when not hydrating. Defaults to Jira's navigable fields
+        :param expand: comma-separated entities to expand when not hydrating
+        :param what: call site label for log messages and the download report
+        :param validate_query: if False, Jira warns about unknown keys and values in the query instead of rejecting it
+        :return: a ResultList of raw issue dicts with the query's total, otherwise None
+        """
+        search = dict(startAt=start_at, maxResults=page_size, validate_query=validate_query)
+        if fields is not None:
+            search.update(fields=fields)
+        if expand is not None:
+            search.update(expand=expand)
+        if hydrate:
+            search.update(fields=SNAPSHOT_FIELDS, expand='changelog')
+        if self.raw_mode:
+            result = self.call_jira(what, self.jira.search_issues, jql, json_result=True, **search)
+            if result is None:
+                return None
+            issues = ResultList(result.get('issues', []), result.get('startAt', start_at), result.get('maxResults', page_size), result.get('total', 0))
+        else:
+            result = self.call_jira(what, self.jira.search_issues, jql, **search)
+            if result is None:
+                return None
+            issues = ResultList([issue.raw for issue in result], result.startAt, result.maxResults, result.total)
+        self._receive(issues, hydrate)
+        return issues
+
+    def _receive(self, issues: list, hydrate: bool) -> None:
+        """Complete any truncated changelogs on a page of issues and, if hydrating, seed the snapshot cache with them.
+
+        :param issues: raw issue dicts
+        :param hydrate: True if the issues were fetched with SNAPSHOT_FIELDS and the changelog
+        """
+        for issue in issues:
+            self.complete_changelog(issue)
+        if hydrate:
+            for issue in issues:
+                self._snapshots[issue['key']] = issue
+                self._snapshot_fields[issue['key']] = frozenset(SNAPSHOT_FIELDS.split(','))
+
+    def iter_sprint_issues(self, page_size: int = PAGE_SIZE, hydrate: bool = False, fields: str = None, jql: str = None,
+                           what: str = 'get Jira sprint issues') -> Iterator[dict]:
+        """Yield the issues of the active sprint from the Agile board/sprint issue endpoint, one page at a time.
+
+        :param page_size: number of issues to request per page
+        :param hydrate: if True, ask for SNAPSHOT_FIELDS and the changelog and seed the snapshot cache with the results
+        :param fields: comma-separated fields to return when not hydrating
+        :param jql: optional JQL conditions to narrow the sprint's issues on the server
+        :param what: call site label for log messages and the download report
+        :return: a generator of raw issue dicts
+        """
+        url = urljoin(self.host, 'rest/agile/1.0/board/{}/sprint/{}/issue'.format(self.board.id, self.current_sprint.id))
+        params = dict(maxResults=page_size)
+        if fields is not None:
+            params.update(fields=fields)
+        if hydrate:
+            params.update(fields=SNAPSHOT_FIELDS, expand='changelog')
+        if jql is not None:
+            params.update(jql=jql)
+
+        start_at = 0
+        while True:
+            params.update(startAt=start_at)
+            response = self.call_jira(what, self.jira._session.get, url, params=params)
+            if response is None:
+                raise JiraBoardException('[!] Unable to retrieve sprint issues at offset {}'.format(start_at))
+            page = response.json()
+            issues = page.get('issues', [])
+            self._receive(issues, hydrate)
+            yield from issues
+            start_at += len(issues)
+            if len(issues) == 0 or start_at >= page.get('total', 0):
+                return
+
+    def local_status_filter(self, jql: str) -> tuple or None:
+        """Reduce a filter's JQL to the project keys and status names it accepts, if that is all it checks.
+
+        Repeated clauses are intersected. Status or project ids, and project names, can't be checked against a story's key
+        and status name, so a query using them is left to the server.
+
+        :param jql: JQL query string
+        :return: a tuple of upper-case project keys, None if the query doesn't check the project, and lower-case status
+            names, otherwise None if the query checks anything else or has no status clause
+        """
+        conditions = self.split_order(jql)[0].strip()
+        while conditions.startswith('(') and conditions.endswith(')'):
+            conditions = conditions[1:-1].strip()
+
+        projects = statuses = None
+        for clause in re.split(r'\s+and\s+', conditions, flags=re.IGNORECASE):
+            clause = clause.strip()
+            status = STATUS_CLAUSE.match(clause)
+            match = status or PROJECT_CLAUSE.match(clause)
+            if match is None:
+                return None
+            values = [next(filter(None, groups), '').strip() for groups in JQL_VALUE.findall(match.group('one') or match.group('many'))]
+            if len(values) == 0 or any(value.isdigit() for value in values):
+                return None
+            if status is not None:
+                names = frozenset(value.lower() for value in values)
+                statuses = names if statuses is None else statuses & names
+            else:
+                if not all(ISSUE_KEY_PATTERN.match('{}-1'.format(value.upper())) for value in values):
+                    return None
+                keys = frozenset(value.upper() for value in values)
+                projects = keys if projects is None else projects & keys
+
+        if statuses is None:
+            return None
+        return projects, statuses
+
+    def get_sprint_tags(self, filter_ids: list, exclude_types: tuple = None) -> tuple:
+        """Fetch the active sprint's stories once and work out which filters return each of them.
+
+        The sprint is listed with SPRINT_LIST_FIELDS only. Filters that only check status are applied locally to that list,
+        anything more involved is sent to the sprint endpoint as a key-only query, and full details are then fetched for
+        the matched stories alone.
+
+        :param filter_ids: ids for the filters
+        :param exclude_types: issue type names to leave out of the results
+        :return: a tuple of the filter id sets keyed by story key, and the raw stories keyed by story key
+        """
+        excluded = frozenset(t.lower() for t in exclude_types or ())
+        listed = {issue['key']: issue for issue in self.iter_sprint_issues(fields=SPRINT_LIST_FIELDS)
+                  if issue['fields']['issuetype']['name'].lower() not in excluded}
+
+        tags = {}
+        for filter_id in filter_ids:
+            local = self.local_status_filter(self.get_filter_jql(filter_id))
+            if local is None:
+                jql = self.split_order(self.get_filter_jql(filter_id, exclude_types))[0]
+                matched = [issue['key'] for issue in self.iter_sprint_issues(fields='key', jql=jql, what='match Jira sprint issues to filter')]
+            else:
+                projects, statuses = local
+                matched = [key for key, issue in listed.items() if issue['fields']['status']['name'].lower() in statuses
+                           and (projects is None or key.rsplit('-', 1)[0].upper() in projects)]
+            for key in matched:
+                if not self.is_aged_out(listed.get(key)):
+                    tags.setdefault(key, set()).add(filter_id)
+
+        issues = {issue['key']: issue for issue in self.iter_keys(list(tags), what='get matched Jira sprint issues')}
+        return tags, issues
+
+    def settle(self, issue_keys: list) -> None:
+        """Record which stories are already on Trello's Complete or archive lists, so they can age out of the working set.
+
+        :param issue_keys: a list of Jira story keys
+        """
+        self.settled_keys = frozenset(issue_keys)
+
+    def old_done_clause(self) -> str or None:
+        """Get the JQL clause matching stories that have been Done for longer than done_horizon_days.
+
+        :return: JQL clause, otherwise None if there is no horizon or nothing is settled on Trello
+        """
+        if self.done_horizon_days <= 0 or len(self.settled_keys) == 0:
+            return None
+        return 'statusCategory = Done AND statusCategoryChangedDate <= -{}d'.format(self.done_horizon_days)
+
+    def age_out(self, jql: str) -> tuple:
+        """Narrow a query so it skips stories past the Done horizon, with a key-only search for the ones that can't be skipped.
+
+        :param jql: JQL query string
+        :return: a tuple of the narrowed JQL and the keys past the horizon that aren't settled on Trello yet
+        """
+        old_done = self.old_done_clause()
+        if old_done is None:
+            return jql, []
+        aged = [issue['key'] for issue in self.iter_jql(self.scope_jql(jql, old_done), fields='key', what='find aged-out Jira issues')]
+        return self.scope_jql(jql, 'NOT ({})'.format(old_done)), [key for key in aged if key not in self.settled_keys]
+
+    def is_aged_out(self, issue: dict or None) -> bool:
+        """Check an already fetched story against the Done horizon.
+
+        :param issue: a raw issue dict with status and statuscategorychangedate
+        :return boolean: True if the story is settled on Trello and has been Done for longer than done_horizon_days
+        """
+        if issue is None or self.old_done_clause() is None or issue['key'] not in self.settled_keys:
+            return False
+        fields = issue['fields']
+        changed = fields.get('statuscategorychangedate')
+        if fields['status']['statusCategory']['name'] != 'Done' or changed is None:
+            return False
+        return parse_jira_date(changed) <= datetime.now(timezone.utc) - timedelta(days=self.done_horizon_days)
+
+    def iter_keys(self, issue_keys: list, hydrate: bool = True, fields: str = None, what: str = 'get Jira issues by key') -> Iterator[dict]:
+        """Yield the Jira issues with the given keys, one 'key in (...)' search per 100 keys.
+
+        :param issue_keys: a list of Jira story keys
+        :param hydrate: passed through to search_page
+        :param fields: passed through to search_page
+        :param what: passed through to search_page
+        :return: a generator of raw issue dicts
+        """
+        keys = list(dict.fromkeys(issue_keys))
+        for i in range(0, len(keys), PAGE_SIZE):
+            yield from self.iter_jql('key in ({})'.format(','.join(keys[i:i + PAGE_SIZE])), hydrate=hydrate, fields=fields, what=what)
+
+    def iter_jql(self, jql: str, page_size: int = PAGE_SIZE, hydrate: bool = False, parallel_pages: int = None, fields: str = None, expand: str = None,
+                 what: str = 'search Jira issues', validate_query: bool = True) -> Iterator[dict]:
+        """Yield every Jira issue matching a JQL query, following startAt/total one page at a time.
+
+        Once the first page reports the total, the remaining pages can be fetched concurrently. They are still yielded in order.
+
+        :param jql: JQL query string
+        :param page_size: number of issues to request per page
+        :param hydrate: passed through to search_page
+        :param parallel_pages: max pages fetched at once after the first. Defaults to max_page_workers
+        :param fields: passed through to search_page
+        :param expand: passed through to search_page
+        :param what: passed through to search_page
+        :param validate_query: passed through to search_page
+        :return: a generator of raw issue dicts
+        """
+        if parallel_pages is None:
+            parallel_pages = self.max_page_workers
+
+        page = self.search_page(jql, 0, page_size, hydrate=hydrate, fields=fields, expand=expand, what=what, validate_query=validate_query)
+        if page is None:
+            raise JiraBoardException('[!] Unable to retrieve issues at offset 0')
+        yield from page
+
+        # the server may hand back fewer than page_size per page, so step by what it actually returned
+        step = len(page)
+        if step == 0 or step >= page.total:
+            return
+
+        if parallel_pages < 2:
+            start_at = step
+            while start_at < page.total:
+                page = self.search_page(jql, start_at, step, hydrate=hydrate, fields=fields, expand=expand, what=what, validate_query=validate_query)
+                if page is None:
+                    raise JiraBoardException('[!] Unable to retrieve issues at offset {}'.format(start_at))
+                if len(page) == 0:
+                    return
+                yield from page
+                start_at += len(page)
+            return
+
+        offsets = list(range(step, page.total, step))
+        with ThreadPoolExecutor(max_workers=parallel_pages) as pool:
+            # submit one window at a time so no more than parallel_pages pages are held in memory
+            for i in range(0, len(offsets), parallel_pages):
+                window = offsets[i:i + parallel_pages]
+                pages = pool.map(lambda start_at: self.search_page(jql, start_at, step, hydrate=hydrate, fields=fields, expand=expand, what=what, validate_query=validate_query), window)
+                for start_at, page in zip(window, pages):
+                    if page is None:
+                        raise JiraBoardException('[!] Unable to retrieve issues at offset {}'.format(start_at))
+                    yield from page
+
+    def get_filter_jql(self, filter_id: int, exclude_types: tuple = None) -> str:
+        """Get the JQL behind a filter_id, optionally excluding issue types on the server.
+
+        :param filter_id: id for the filter
+        :param exclude_types: issue type names to leave out of the results
+        :return: JQL query string
+        """
+        jql = self.get_jql_filter(filter_id).jql
+        if exclude_types:
+            jql = self.scope_jql(jql, 'issuetype not in ({})'.format(', '.join('"{}"'.format(t) for t in exclude_types)))
+        return jql
+
+    def in_filter(self, issue_key: str, filter_id: int, exclude_types: tuple = None) -> bool:
+        """Check whether a JQL filter currently returns a given story, without running the whole filter.
+
+        :param issue_key: a Jira story key
+        :param filter_id: id for the filter
+        :param exclude_types: passed through to get_filter_jql
+        :return boolean: True if the filter returns the story, otherwise False
+        """
+        jql = self.scope_jql(self.get_filter_jql(filter_id, exclude_types), 'key = {}'.format(issue_key))
+        return next(self.iter_jql(jql, page_size=1, fields='key', what='check Jira filter membership'), None) is not None
+
+    def iter_issues(self, filter_id: int, page_size: int = PAGE_SIZE, hydrate: bool = False, parallel_pages: int = None, exclude_types: tuple = None) -> Iterator[dict]:
+        """Yield every Jira issue returned by a given JQL filter_id as its page arrives.
+
+        :param filter_id: id for the filter
+        :param page_size: number of issues to request per page
+        :param hydrate: passed through to search_page
+        :param parallel_pages: passed through to iter_jql
+        :param exclude_types: passed through to get_filter_jql
+        :return: a generator of raw issue dicts
+        """
+        jql, keep = self.age_out(self.get_filter_jql(filter_id, exclude_types))
+        yield from self.iter_jql(jql, page_size, hydrate=hydrate, parallel_pages=parallel_pages, what='get issues from Jira filter')
+        yield from self.iter_keys(keep, hydrate=hydrate, what='get issues from Jira filter')
+
+    def get_issues_from_filter(self, filter_id: int, hydrate: bool = False) -> list:
         """Get Jira issues returned by a given JQL filter_id.
 
         :param filter_id: id for the filter
+        :param hydrate: passed through to search_page
         :return:
         """
-        jql = self.get_jql_filter(filter_id).jql
-        issues = None
-        try:
-            issues = self.jira.search_issues(jql, maxResults=100)
-        except JIRAError:
-            print('[!] Failed to get issues from Jira filter.\nRetrying in a few seconds.'.format(str(JIRAError)))
-            try:
-                issues = self.jira.search_issues(jql, maxResults=100)
-            except JIRAError:
-                print('[!] Failed to get issues from Jira filter.'.format(str(JIRAError)))
-        finally:
-            return issues
+        return list(self.iter_issues(filter_id, hydrate=hydrate))
 
-    def get_issues(self, filter_id: int) -> list:
+    def get_issues(self, filter_id: int, hydrate: bool = True, parallel_pages: int = None, exclude_types: tuple = None) -> Iterator[dict]:
         """Seems weirdly like a dupe of get_issues_from_filter(), but if things are working I don't wanna break it right now..
 
+        Outside of testMode the issues are streamed page by page, so nothing past the first page is fetched until it is consumed.
+
         :param filter_id: id for the filter
+        :param hydrate: if True, fetch everything get_parsed_stories needs in the search request itself
+        :param parallel_pages: passed through to iter_jql
+        :param exclude_types: issue type names to filter out on the server, e.g. QA_EXCLUDED_TYPES
         :return:
         """
-        issues = None
         if self.testMode:
-            jsonData = open(os.path.join('testJiraData.json'), 'r', encoding='utf-8')
-            issues = json.loads(jsonData.read())
+            return self.iter_fixture()
+        if self.store is not None and hydrate:
+            return self.sync_filter(filter_id, exclude_types)
+        return self.iter_issues(filter_id, hydrate=hydrate, parallel_pages=parallel_pages, exclude_types=exclude_types)
+
+    def iter_fixture(self) -> Iterator[dict]:
+        """Stream the issues of the testMode fixture, seeding the snapshot cache so parsing them doesn't call Jira.
+
+        :return: a generator of raw issue dicts
+        """
+        for issue in iter_json_records(self.fixture_path):
+            self._snapshots[issue['key']] = issue
+            self._snapshot_fields[issue['key']] = frozenset(SNAPSHOT_FIELDS.split(','))
+            parent = issue.get('fields', {}).get('parent')
+            if parent is not None:
+                self._children.setdefault(parent['key'], []).append(issue)
+                self._parents[issue['key']] = parent['key']
+            yield issue
+
+    def split_order(self, jql: str) -> tuple:
+        """Split a JQL query into its conditions and its ORDER BY clause.
+
+        :param jql: JQL query string
+        :return: a tuple of the conditions and the ORDER BY fields, which is None if the query has no ORDER BY
+        """
+        parts = re.split(r'\s+order\s+by\s+', jql, maxsplit=1, flags=re.IGNORECASE)
+        return parts[0], parts[1] if len(parts) > 1 else None
+
+    def scope_jql(self, jql: str, clause: str) -> str:
+        """AND an extra clause onto a JQL query, keeping any ORDER BY at the end.
+
+        :param jql: JQL query string
+        :param clause: JQL clause to add
+        :return: the narrowed JQL query string
+        """
+        conditions, order = self.split_order(jql)
+        scoped = '({}) AND {}'.format(conditions, clause)
+        if order is not None:
+            scoped = '{} ORDER BY {}'.format(scoped, order)
+        return scoped
+
+    def get_tagged_stories(self, filter_ids: list, exclude_types: tuple = None) -> list:
+        """Fetch and parse the union of several filters once, tagging each story with the filter(s) that returned it.
+
+        Membership comes from a key-only search per filter. The stories themselves come from one hydrated search over the
+        OR of the filters, from the issue store when one is configured, or from the active sprint when sprint_scoped is set.
+
+        :param filter_ids: ids for the filters
+        :param exclude_types: passed through to get_filter_jql
+        :return: parsed stories, each with a 'filters' list of the filter ids that matched it
+        """
+        tags = {}
+        issues = {}
+
+        if self.testMode:
+            for issue in self.get_issues(filter_ids[0]):
+                tags[issue['key']] = set(filter_ids)
+                issues[issue['key']] = issue
+
+        elif self.sprint_scoped:
+            tags, issues = self.get_sprint_tags(filter_ids, exclude_types)
+
+        elif self.store is not None:
+            for filter_id in filter_ids:
+                for issue in self.sync_filter(filter_id, exclude_types):
+                    tags.setdefault(issue['key'], set()).add(filter_id)
+                    issues.setdefault(issue['key'], issue)
+
         else:
-            try:
-                issues = self.get_issues_from_filter(filter_id)
-            except JIRAError:
-                print('[!] Failed to get issues from Jira filter.\nRetrying in a few seconds.'.format(str(JIRAError)))
-                try:
-                    issues = self.get_issues_from_filter(filter_id)
-                except JIRAError:
-                    print('[!] Failed to get issues from Jira filter.'.format(str(JIRAError)))
-        return issues
+            jqls = {filter_id: self.get_filter_jql(filter_id, exclude_types) for filter_id in filter_ids}
+            for filter_id, jql in jqls.items():
+                jql, keep = self.age_out(jql)
+                for key in [issue['key'] for issue in self.iter_jql(jql, fields='key', what='list Jira filter members')] + keep:
+                    tags.setdefault(key, set()).add(filter_id)
+
+            union = ' OR '.join('({})'.format(self.split_order(jql)[0]) for jql in jqls.values())
+            old_done = self.old_done_clause()
+            if old_done is not None:
+                union = self.scope_jql(union, 'NOT ({})'.format(old_done))
+            issues = {issue['key']: issue for issue in self.iter_jql(union, hydrate=True, what='get issues from Jira filters')}
+
+            # stories past the Done horizon that aren't settled on Trello yet
+            issues.update({issue['key']: issue for issue in self.iter_keys([key for key in tags if key not in issues], what='get aged-out Jira issues')})
 
-    def get_issue(self, issue_key: str, fields: str = 'status') -> Issue:
+        stories = self.get_parsed_stories(issue for key, issue in issues.items() if key in tags)
+        for story in stories:
+            story['filters'] = sorted(tags[story['jira_key']])
+        return stories
+
+    def sync_filter(self, filter_id: int, exclude_types: tuple = None) -> Iterator[dict]:
+        """Bring the issue store up to date for a filter and yield its issues from the store.
+
+        Membership and each issue's 'updated' come from one light search. Full issues are downloaded only when they are
+        missing from the store or their 'updated' differs from the stored copy.
+
+        :param filter_id: id for the filter
+        :param exclude_types: passed through to get_filter_jql
+        :return: a generator of raw issue dicts in filter order
+        """
+        jql, keep = self.age_out(self.get_filter_jql(filter_id, exclude_types))
+        listed = {issue['key']: issue['fields'].get('updated') for issue in self.iter_jql(jql, fields='updated', what='list Jira filter updates')}
+        listed.update({issue['key']: issue['fields'].get('updated') for issue in self.iter_keys(keep, hydrate=False, fields='updated', what='list Jira filter updates')})
+        keys = list(listed)
+
+        stored = self.store.get_issues(keys)
+        stale = [key for key in keys if key not in stored or stored[key]['fields'].get('updated') != listed[key]]
+        for issue in self.iter_keys(stale, what='refresh stale Jira issues'):
+            self.store.store_issue(issue)
+            stored[issue['key']] = issue
+
+        for key in keys:
+            if key not in stored:
+                continue
+            if key not in self._snapshots:
+                self._snapshots[key] = stored[key]
+                self._snapshot_fields[key] = frozenset(SNAPSHOT_FIELDS.split(','))
+            yield self._snapshots[key]
+
+    def get_issue(self, issue_key: str, fields: str = 'status', expand: str = 'changelog') -> dict:
         """Get a Jira story given a key.
 
         :param issue_key: a Jira story key
-        :param fields:
-        :return:
+        :param fields: comma-separated fields to return
+        :param expand: comma-separated entities to expand, or None
+        :return: the story as a raw dict, with its changelog if it was expanded
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields=fields, expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
+        params = dict(fields=fields)
+        if expand is not None:
+            params.update(expand=expand)
+        what = 'get Jira issue [{}]'.format(','.join(filter(None, (fields, expand))))
+        if self.raw_mode:
+            issue = self.call_jira(what, self.jira._get_json, 'issue/{}'.format(issue_key), params=params)
+        else:
+            issue = self.call_jira(what, self.jira.issue, issue_key, **params)
+            issue = issue.raw if issue is not None else None
+        if issue is None:
+            raise JiraBoardException('[!] Unable to retrieve issue {}'.format(issue_key))
+        return self.complete_changelog(issue)
+
+    def get_changelog(self, issue_key: str, start_at: int = 0) -> list:
+        """Page through the changelog of a Jira story, oldest history first.
+
+        :param issue_key: a Jira story key
+        :param start_at: index of the first history to return
+        :return: a list of raw history dicts
+        """
+        histories = []
+        while True:
+            page = self.call_jira('get Jira changelog', self.jira._get_json, 'issue/{}/changelog'.format(issue_key),
+                                  params=dict(startAt=start_at, maxResults=PAGE_SIZE))
+            if page is None:
+                raise JiraBoardException('[!] Unable to retrieve changelog for {} at offset {}'.format(issue_key, start_at))
+            values = page.get('values', [])
+            histories.extend(values)
+            start_at += len(values)
+            if len(values) == 0 or page.get('isLast', start_at >= page.get('total', 0)):
+                return histories
+
+    def complete_changelog(self, issue: dict) -> dict:
+        """Fill in the histories Jira left out of an expanded changelog.
+
+        Expanded changelogs stop at 100 histories. When one is cut short the rest are paged in from the changelog endpoint,
+        starting after the histories already kept in the issue store, if it has the story.
+
+        :param issue: a raw issue dict with its changelog expanded
+        :return: the same issue with every history in its changelog
+        """
+        changelog = issue.get('changelog')
+        if changelog is None:
+            return issue
+        histories = changelog.get('histories', [])
+        if len(histories) >= changelog.get('total', len(histories)):
+            return issue
+
+        key = issue['key']
+        known = []
+        stored = self.store.get_issue(key) if self.store is not None else None
+        if stored is not None:
+            known = stored.get('changelog', {}).get('histories', [])
+        # the changelog endpoint lists histories oldest first, so the stored ones are its first len(known) entries.
+        # If Jira now reports fewer than that, some were deleted and the whole changelog is read again
+        start_at = len(known) if len(known) <= changelog.get('total', 0) else 0
+
+        merged = {h['id']: h for h in known + histories + self.get_changelog(key, start_at)}
+        histories = sorted(merged.values(), key=lambda h: int(h['id']))
+        issue['changelog'] = dict(startAt=0, maxResults=len(histories), total=len(histories), histories=histories)
+        return issue
+
+    def snapshot_gaps(self, issue_key: str, fields: str, changelog: bool) -> tuple:
+        """Work out what the cached snapshot of a story is missing for a caller.
+
+        :param issue_key: a Jira story key
+        :param fields: comma-separated fields the caller reads
+        :param changelog: True if the caller reads the changelog
+        :return: a tuple of the missing field names and whether the changelog is missing
+        """
+        issue = self._snapshots.get(issue_key)
+        missing = set(fields.split(',')) - self._snapshot_fields.get(issue_key, frozenset())
+        # a compiled timeline answers everything the changelog was needed for
+        return missing, changelog and issue_key not in self._timelines and (issue is None or 'changelog' not in issue)
+
+    def get_snapshot(self, issue_key: str, fields: str = SNAPSHOT_FIELDS, changelog: bool = True) -> dict:
+        """Get a Jira story from the per-run snapshot cache, fetching only what the cache doesn't have yet.
+
+        Callers name the fields they read. A cached story lacking some of them is topped up with just those fields, and the
+        changelog is only expanded for callers that need it.
+
+        :param issue_key: a Jira story key
+        :param fields: comma-separated fields the caller reads
+        :param changelog: True if the caller reads the changelog
+        :return: the story as a raw dict with at least the requested fields
+        """
+        missing, needs_changelog = self.snapshot_gaps(issue_key, fields, changelog)
+        issue = self._snapshots.get(issue_key)
+        if issue is not None and len(missing) == 0 and not needs_changelog:
+            return issue
+
+        fetched = self.get_issue(issue_key, fields=','.join(sorted(missing)) or fields, expand='changelog' if needs_changelog else None)
+        return self.merge_snapshot(fetched, fields)
+
+    def merge_snapshot(self, fetched: dict, fields: str) -> dict:
+        """Fold a freshly fetched story into the snapshot cache.
+
+        :param fetched: a raw issue dict
+        :param fields: comma-separated fields that were requested for it
+        :return: the cached snapshot with the new fields, and changelog if there is one, merged in
+        """
+        issue_key = fetched['key']
+        issue = self._snapshots.get(issue_key)
+        if issue is None:
+            issue = fetched
+        else:
+            issue['fields'].update(fetched.get('fields', {}))
+            if 'changelog' in fetched:
+                issue['changelog'] = fetched['changelog']
+        self._snapshots[issue_key] = issue
+        self._snapshot_fields[issue_key] = self._snapshot_fields.get(issue_key, frozenset()) | set(fields.split(','))
+        return issue
+
+    def hydrate(self, issue_keys: list) -> None:
+        """Fetch snapshots for every key not already cached, using up to max_workers requests in flight at once.
+
+        :param issue_keys: a list of Jira story keys
+        """
+        missing = [key for key in dict.fromkeys(issue_keys) if self.snapshot_gaps(key, SNAPSHOT_FIELDS, True) != (set(), False)]
+        if self.max_workers < 2 or len(missing) < 2:
+            for key in missing:
+                self.get_snapshot(key)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # consume the iterator so a failed fetch raises here like it would sequentially
+            list(pool.map(self.get_snapshot, missing))
+
+    def _iter_hydrated(self, raw_issues: Iterator[dict], chunk_size: int = PAGE_SIZE) -> Iterator[dict]:
+        """Consume raw_issues a chunk at a time, hydrating each chunk before yielding it.
+
+        :param raw_issues: any iterable of issues, including the generator from get_issues
+        :param chunk_size: number of issues to hold at once
+        :return: a generator of issues whose snapshots are cached
+        """
+        raw_issues = iter(raw_issues)
+        chunk = list(islice(raw_issues, chunk_size))
+        while chunk:
+            keys = [issue['key'] for issue in chunk]
+            self.hydrate(keys)
+            yield from chunk
+            chunk = list(islice(raw_issues, chunk_size))
+
+    def trim_snapshot(self, issue_key: str) -> None:
+        """Shrink a parsed story's snapshot, in place, to RETAINED_FIELDS and drop its changelog once the timeline is built.
+
+        Descriptions, attachments and changelogs are most of a story's size, so after this the snapshot cache grows by a
+        few small fields per story instead of by the whole search payload.
+
+        :param issue_key: a Jira story key
+        """
+        issue = self._snapshots.get(issue_key)
+        if issue is None:
+            return
+        retained = frozenset(RETAINED_FIELDS.split(','))
+        fields = issue.get('fields', {})
+        for name in [name for name in fields if name not in retained]:
+            del fields[name]
+        if issue_key in self._timelines:
+            issue.pop('changelog', None)
+        self._snapshot_fields[issue_key] = self._snapshot_fields.get(issue_key, frozenset()) & retained
+
+    def get_timeline(self, issue_key: str) -> StoryTimeline:
+        """Get the compiled status timeline of a Jira story, building it from the snapshot on first use.
+
+        :param issue_key: a Jira story key
+        :return: StoryTimeline holding every QA flag for the story
+        """
+        timeline = self._timelines.get(issue_key)
+        if timeline is None:
+            timeline = StoryTimeline(self.get_snapshot(issue_key, fields='status', changelog=True), self.testers | self.tester_account_ids)
+            self._timelines[issue_key] = timeline
+        return timeline
+
+    def invalidate(self, issue_key: str = None) -> None:
+        """Drop a story from the snapshot cache so the next lookup refetches it. Call after a transition or write.
+
+        :param issue_key: a Jira story key. If None, the whole cache is cleared
+        """
+        if issue_key is None:
+            self._snapshots.clear()
+            self._snapshot_fields.clear()
+            self._timelines.clear()
+            self._children.clear()
+        else:
+            self._snapshots.pop(issue_key, None)
+            self._snapshot_fields.pop(issue_key, None)
+            self._timelines.pop(issue_key, None)
+            self._children.pop(issue_key, None)
+
+    def index_children(self, parent_keys: list) -> None:
+        """Add stories to the parent/children graph, with one 'parent in (...)' search per 100 stories not indexed yet.
+
+        :param parent_keys: a list of Jira story keys
+        """
+        if self.testMode:
+            # the fixture is the whole world in testMode, and iter_fixture already linked its children
+            for key in parent_keys:
+                self._children.setdefault(key, [])
+            return
+
+        keys = [key for key in dict.fromkeys(parent_keys) if key not in self._children and ISSUE_KEY_PATTERN.match(key)]
+        for i in range(0, len(keys), PAGE_SIZE):
+            chunk = keys[i:i + PAGE_SIZE]
+            children = {key: [] for key in chunk}
             try:
-                issue = self.jira.issue(issue_key, fields=fields, expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
+                for child in self.iter_jql('parent in ({})'.format(','.join(chunk)), fields=CHILD_FIELDS, what='index Jira children'):
+                    parent = child['fields']['parent']['key']
+                    children.setdefault(parent, []).append(child)
+                    self._parents[child['key']] = parent
+            except JiraBoardException:
+                print('[!] Unable to index the children of {}'.format(', '.join(chunk)))
+                continue
+            self._children.update(children)
+
+    def get_children(self, issue_key: str) -> list:
+        """Get the subtasks, defects and other children of a Jira story from the parent/children graph.
+
+        :param issue_key: a Jira story key
+        :return: a list of raw child issue dicts with CHILD_FIELDS
+        """
+        if issue_key not in self._children:
+            self.index_children([issue_key])
+        return self._children.get(issue_key, [])
+
+    def has_subtasks(self, issue_key: str) -> bool:
+        """Given an issue_key, check if the story has any subtasks.
+
+        :param issue_key: a Jira story key
+        :return boolean: True if the story has at least one child, otherwise False
+        """
+        return len(self.get_children(issue_key)) > 0
+
+    def get_parent(self, issue_key: str) -> str or None:
+        """Get the key of a Jira issue's parent story.
+
+        :param issue_key: a Jira issue key
+        :return: the parent story key, otherwise None if the issue has no parent
+        """
+        if issue_key not in self._parents:
+            parent = self.get_snapshot(issue_key, fields='parent', changelog=False)['fields'].get('parent')
+            self._parents[issue_key] = parent['key'] if parent is not None else None
+        return self._parents[issue_key]
+
+    def transition_issue(self, issue_key: str, transition: int or str) -> None:
+        """Transition a Jira story and invalidate its snapshot.
+
+        :param issue_key: a Jira story key
+        :param transition: ID or name of the transition to perform
+        """
+        try:
+            self.call_jira('transition Jira issue', self.jira.transition_issue, issue_key, transition=transition, idempotent=False)
         finally:
-            if issue is None:
-                raise JiraBoardException('[!] Unable to retrieve issue {}'.format(issue_key))
-            return issue
+            self.invalidate(issue_key)
+
+    def create_issue(self, fields: dict) -> Issue:
+        """Create a Jira issue and invalidate the snapshot of its parent story, if it has one.
+
+        :param fields: a dict of field names and values for the new issue
+        :return: the newly created issue
+        """
+        try:
+            return self.call_jira('create Jira issue', self.jira.create_issue, fields=fields, idempotent=False)
+        finally:
+            parent = fields.get('parent')
+            if parent is not None:
+                self.invalidate(parent.get('key'))
+
+    def create_issues(self, field_list: list, chunk_size: int = BULK_CREATE_SIZE) -> list:
+        """Create Jira issues through the bulk create endpoint, chunk_size issues per request.
+
+        Parents of the new issues have their snapshots invalidated, and every issue that fails to be created is reported.
+
+        :param field_list: a list of dicts of field names and values, one per new issue
+        :param chunk_size: maximum number of issues per request
+        :return: a list of dicts with 'status', 'issue', 'error' and 'input_fields' for each entry of field_list, in order
+        """
+        results = []
+        for i in range(0, len(field_list), chunk_size):
+            chunk = field_list[i:i + chunk_size]
+            try:
+                created = self.call_jira('bulk create Jira issues', self.jira.create_issues, chunk, prefetch=False, idempotent=False)
+            finally:
+                for fields in chunk:
+                    parent = fields.get('parent')
+                    if parent is not None:
+                        self.invalidate(parent.get('key'))
+            if created is None:
+                created = [dict(status='Error', issue=None, error='bulk create request failed', input_fields=fields) for fields in chunk]
+            results.extend(created)
+
+        for result in results:
+            if result['status'] == 'Success':
+                print('[+] Created Jira issue {}'.format(result['issue'].key))
+            else:
+                print('[!] Failed to create Jira issue "{}": {}'.format(result['input_fields'].get('summary'), result['error']))
+        return results
 
     def get_current_status(self, issue_key: str) -> str or None:
         """Get the current status for a given Jira story.
@@ -214,20 +1048,11 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return:
         """
-        issue = None
         try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is not None:
-                return issue.fields.status.name
-            else:
-                return None
+            issue = self.get_snapshot(issue_key, fields='status', changelog=False)
+        except JiraBoardException:
+            return None
+        return issue['fields']['status']['name']
 
     def get_current_status_category(self, issue_key: str) -> str or None:
         """Get the status category for a given Jira story.
@@ -235,41 +1060,23 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return:
         """
-        issue = None
         try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is not None:
-                return issue.fields.status.statusCategory.name
-            else:
-                return None
+            issue = self.get_snapshot(issue_key, fields='status', changelog=False)
+        except JiraBoardException:
+            return None
+        return issue['fields']['status']['statusCategory']['name']
 
-    def get_most_recent_status_change(self, issue_key: str) -> str or None:
+    def get_most_recent_status_change(self, issue_key: str) -> dict or None:
         """Get the most recent status change for a Jira story, given it's issue_key.
 
         :param issue_key: a Jira story key
-        :return: object representing the most recent status change
+        :return: dict representing the most recent status change
         """
-        issue = None
         try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is not None:
-                return next(filter(lambda s: s['toString'], issue.fields.status.name), None)
-            else:
-                return None
+            statuses = self.get_timeline(issue_key).statuses
+        except JiraBoardException:
+            return None
+        return statuses[0] if len(statuses) > 0 else None
 
     def is_hotfix(self, issue_key: str) -> bool:
         """Given am issue_key, check if the story is a hotfix.
@@ -277,20 +1084,11 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if story is a hotfix, otherwise False
         """
-        issue = None
         try:
-            issue = self.jira.issue(issue_key, fields='labels', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='labels', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is not None:
-                return next(filter(lambda l: l.lower() == 'hotfix', issue.fields.labels), None) is not None
-            else:
-                return False
+            issue = self.get_snapshot(issue_key, fields='labels', changelog=False)
+        except JiraBoardException:
+            return False
+        return next(filter(lambda l: l.lower() == 'hotfix', issue['fields']['labels']), None) is not None
 
     def is_atomic(self, issue_key: str) -> bool:
         """Given am issue_key, check if the story is from Atomic Object.
@@ -298,7 +1096,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if story is from Atomic Object, otherwise False
         """
-        return 'MMDH-' in self.jira.issue(issue_key).key
+        return 'MMDH-' in issue_key
 
     def is_in_staging(self, issue_key: str, stories: list) -> bool:
         """Given am issue_key, check if the story is in the staging branch.
@@ -319,11 +1117,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a current status of "Ready for QA Release" and no fail statuses in the past, otherwise False
         """
-        current_status = self.get_current_status(issue_key)
-        qa_fail = self.has_failed_qa(issue_key)
-        if current_status is None:
-            raise JiraBoardException('[!] No current status found')
-        return current_status == 'Ready for QA Release' and not qa_fail
+        return self.get_timeline(issue_key).is_fresh_qa_ready
 
     def is_stale_qa_ready(self, issue_key: str) -> bool:
         """Given am issue_key, check if the story is ready for QA after previously failing testing.
@@ -331,11 +1125,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a current status of 'Ready for QA Release' and at least one prior fail status, otherwise False
         """
-        current_status = self.get_current_status(issue_key)
-        qa_fail = self.has_failed_qa(issue_key)
-        if current_status is None:
-            raise JiraBoardException('[!] No current status found')
-        return current_status == 'Ready for QA Release' and qa_fail
+        return self.get_timeline(issue_key).is_stale_qa_ready
 
     def is_in_qa_testing(self, issue_key: str) -> bool:
         """Given am issue_key, check if the story is currently in 'QA Testing'.
@@ -343,10 +1133,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a current status of 'QA Testing', otherwise False
         """
-        current_status = self.get_current_status(issue_key)
-        if current_status is None:
-            raise JiraBoardException('[!] No current status found')
-        return current_status == 'QA Testing'
+        return self.get_timeline(issue_key).is_in_qa_testing
 
     def has_complete_status(self, issue_key: str) -> bool:
         """Given am issue_key, check if the story has a 'Complete' status category.
@@ -354,10 +1141,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a current status category of 'Done', otherwise False
         """
-        current_status_category = self.get_current_status_category(issue_key)
-        if current_status_category is None:
-            raise JiraBoardException('[!] No current status category found')
-        return current_status_category == 'Done'
+        return self.get_timeline(issue_key).has_complete_status
 
     def for_qa_team(self, issue_key: str) -> bool:
         """Similar to passed_qa but checks if a QA tester moved this at any point to make sure it actually got tested.
@@ -365,23 +1149,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a status change with a valid QA tester, otherwise False
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is None:
-                raise JiraBoardException('[!] NoneType issue is not valid.')
-            else:
-                # Let's try this another way
-                statuses = self.get_statuses(issue.changelog.histories)
-                tester = next(filter(lambda s: s['authorName'] in self.testers and 'qa release' in s['fromString'].lower() and 'qa testing' in s['toString'].lower(), statuses), None)
-                return tester is not None
+        return self.get_timeline(issue_key).for_qa_team
 
     def passed_qa(self, issue_key: str) -> bool:
         """Given an issue_key, check if the story has passed QA.
@@ -389,22 +1157,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a passing status with a valid QA tester, otherwise False
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is None:
-                raise JiraBoardException('[!] NoneType issue is not valid.')
-            else:
-                statuses = self.get_statuses(issue.changelog.histories)
-                tester = next(filter(lambda s: s['authorName'] in self.testers, statuses), None)
-                return self.has_complete_status(issue.key) and tester is not None
+        return self.get_timeline(issue_key).passed_qa
 
     def has_failed_qa(self, issue_key: str) -> bool:
         """Given an issue_key, check if the story has failed QA in the past.
@@ -412,26 +1165,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a fail status in the past, otherwise False
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is None:
-                raise JiraBoardException('[!] NoneType issue is not valid.')
-            else:
-                statuses = self.get_statuses(issue.changelog.histories)
-                failStatus      = next(filter(
-                    lambda status: (status['authorName'] in self.testers)
-                    and status['fromString'] == 'QA Testing'
-                    and status['toString'] == 'In Progress', statuses
-                ), None)
-                return True if failStatus is not None else False
+        return self.get_timeline(issue_key).has_failed_qa
 
     def is_currently_failed(self, issue_key: str) -> bool:
         """Given an issue_key, check if a Jira story currently has a failure status.
@@ -439,10 +1173,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return boolean: True if the story has a current fail status, otherwise False
         """
-        current_status = self.get_current_status(issue_key)
-        if current_status is None:
-            raise JiraBoardException('[!] No current status found')
-        return current_status in ['In Progress', 'Backlog']
+        return self.get_timeline(issue_key).is_currently_failed
 
     def is_defect(self, issue_key: str) -> bool:
         """Return True if Jira issuetype is a defect.
@@ -450,9 +1181,7 @@ class JiraBoard(object):
         :param issue_key:
         :return:
         """
-        return self.get_issue(
-            issue_key,
-            fields='issuetype').fields.issuetype.name.lower() == 'defect'
+        return self.get_snapshot(issue_key, fields='issuetype', changelog=False)['fields']['issuetype']['name'].lower() == 'defect'
 
     def is_qa_task(self, issue_key: str) -> bool:
         """Return True if Jira issuetype is a defect.
@@ -460,9 +1189,7 @@ class JiraBoard(object):
         :param issue_key:
         :return:
         """
-        return self.get_issue(
-            issue_key,
-            fields='issuetype').fields.issuetype.name.lower() == 'qa task'
+        return self.get_snapshot(issue_key, fields='issuetype', changelog=False)['fields']['issuetype']['name'].lower() == 'qa task'
 
     def is_bug(self, issue_key: str) -> bool:
         """Return True if Jira issuetype is a bug.
@@ -470,22 +1197,65 @@ class JiraBoard(object):
         :param issue_key:
         :return:
         """
-        return self.get_issue(
-            issue_key,
-            fields='issuetype').fields.issuetype.name.lower() == 'bug'
+        return self.get_snapshot(issue_key, fields='issuetype', changelog=False)['fields']['issuetype']['name'].lower() == 'bug'
+
+    def keys_changed_status(self, issue_keys: list, from_status: str, to_status: str, by: frozenset = None) -> set:
+        """Find which of the given stories ever moved between two statuses, one JQL query per 100 keys.
+
+        :param issue_keys: a list of Jira story keys
+        :param from_status: status name the story moved out of
+        :param to_status: status name the story moved into
+        :param by: Jira account ids that must have made the change. Defaults to the QA testers' account ids
+        :return: the set of keys with a matching status change
+        """
+        if by is None:
+            by = self.tester_account_ids
+        by = sorted(filter(None, (a.strip() for a in by)))
+        changed = 'status CHANGED FROM "{}" TO "{}"'.format(from_status, to_status)
+        if len(by) > 0:
+            changed = '{} BY ({})'.format(changed, ', '.join('"{}"'.format(a) for a in by))
+
+        keys = list(dict.fromkeys(issue_keys))
+        result = set()
+        for i in range(0, len(keys), PAGE_SIZE):
+            jql = 'key in ({}) AND {}'.format(','.join(keys[i:i + PAGE_SIZE]), changed)
+            result.update(issue['key'] for issue in self.iter_jql(jql, fields='key', what='search Jira status changes'))
+        return result
 
-    def get_statuses(self, change_log: dict) -> list:
+    def for_qa_team_keys(self, issue_keys: list) -> set:
+        """Batch version of for_qa_team.
+
+        :param issue_keys: a list of Jira story keys
+        :return: the set of keys a tester has moved from 'Ready for QA Release' to 'QA Testing'
+        """
+        if len(self.tester_account_ids) == 0:
+            return self.keys_from_timelines(issue_keys, 'for_qa_team')
+        return self.keys_changed_status(issue_keys, 'Ready for QA Release', 'QA Testing')
+
+    def keys_from_timelines(self, issue_keys: list, flag: str) -> set:
+        """Answer a batch predicate from the stories' changelogs, for when no tester account ids are configured.
+
+        :param issue_keys: a list of Jira story keys
+        :param flag: name of the StoryTimeline flag to check
+        :return: the set of keys whose timeline has the flag set
+        """
+        keys = list(dict.fromkeys(issue_keys))
+        self.loader.load_many(keys, fields='status', changelog=True)
+        self.loader.dispatch()
+        return {key for key in keys if getattr(self.get_timeline(key), flag)}
+
+    def get_statuses(self, change_log: list) -> list:
         """Get all status changes from a change_log associated with a Jira story.
 
-        :param change_log: expanded list of fields returned from Jira API for a single issue
+        :param change_log: raw changelog histories returned from Jira API for a single issue
         :return list: a list of dicts representing the status change and it's author
         """
         return [dict(
-            authorName  = ch.author.displayName,
-            created     = ch.created,
-            fromString  = ch.items[0].fromString,
-            toString    = ch.items[0].toString
-        ) for ch in change_log if ch.items[0].field.lower() == 'status']
+            authorName  = ch['author']['displayName'],
+            created     = ch['created'],
+            fromString  = ch['items'][0]['fromString'],
+            toString    = ch['items'][0]['toString']
+        ) for ch in change_log if ch['items'][0]['field'].lower() == 'status']
 
     def get_subtasks(self, issue_key: str) -> list:
         """Get subtasks of a Jira story.
@@ -493,20 +1263,7 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return list: a list of subtask names
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='status', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.')
-        finally:
-            if issue is None:
-                raise JiraBoardException('[!] NoneType issue is not valid.')
-            else:
-                return [task.lower() for task in issue.fields.subtasks]
+        return [task['fields']['summary'].lower() for task in self.get_children(issue_key)]
 
     def get_attachments(self, issue_key: str) -> list:
         """Get attachments from a Jira story.
@@ -514,20 +1271,8 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return list: a list of URLs pointing to story attachments
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields='attachment', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='attachment', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.'.format(str(JIRAError)))
-        finally:
-            if issue is None:
-                raise JiraBoardException('[!] NoneType issue is not valid.')
-            else:
-                return ['{}secure/attachment/{}/{}'.format(self.host, a.id, a.filename) for a in issue.fields.attachment]
+        issue = self.get_snapshot(issue_key, fields='attachment', changelog=False)
+        return ['{}secure/attachment/{}/{}'.format(self.host, a['id'], a['filename']) for a in issue['fields']['attachment']]
 
     def get_labels(self, issue_key: str) -> list:
         """Get a list of labels attached to a story by issue_key.
@@ -535,139 +1280,144 @@ class JiraBoard(object):
         :param issue_key: a Jira story key
         :return list: a list Jira story labels
         """
-        issue = None
-        try:
-            issue = self.jira.issue(issue_key, fields='labels', expand='changelog')
-        except JIRAError:
-            print('[!] Failed to get Jira issue.\nRetrying in a few seconds.')
-            try:
-                issue = self.jira.issue(issue_key, fields='labels', expand='changelog')
-            except JIRAError:
-                print('[!] Failed to get Jira issue.'.format(str(JIRAError)))
-        finally:
-            if issue is None:
-                raise JiraBoardException('[!] NoneType issue is not valid.')
-            else:
-                return [label.lower() for label in issue.fields.labels]
+        return [label.lower() for label in self.get_snapshot(issue_key, fields='labels', changelog=False)['fields']['labels']]
 
-    def get_parsed_stories(self, raw_issues: list, testrail_mode: bool = False) -> list:
+    def get_comments(self, issue_key: str, limit: int = None) -> list:
+        """Get the newest comments on a Jira story.
+
+        :param issue_key: a Jira story key
+        :param limit: maximum number of comments to return. Defaults to comment_window
+        :return: a list of raw comment dicts, newest first
+        """
+        params = dict(orderBy='-created', maxResults=limit or self.comment_window)
+        result = self.call_jira('get Jira comments', self.jira._get_json, 'issue/{}/comment'.format(issue_key), params=params)
+        if result is None:
+            return []
+        return sorted(result.get('comments', []), key=lambda c: c['updated'], reverse=True)
+
+    def render_comments(self, issue_key: str) -> str:
+        """Format the newest comments on a Jira story as markdown for a Trello card description.
+
+        :param issue_key: a Jira story key
+        :return: markdown string
+        """
+        return '\n'.join([
+            '\n_**{}** at {}_:\n\n{}\n\n'.format(
+                comment['author']['displayName'],
+                format_jira_date(comment['updated']),
+                ''.join(re.findall(r'[^*`#\t\'"]', comment['body']))
+            ) for comment in self.get_comments(issue_key)
+        ])
+
+    def render_statuses(self, issue_key: str) -> str:
+        """Format the status changes of a Jira story as markdown for a Trello card description.
+
+        :param issue_key: a Jira story key
+        :return: markdown string
+        """
+        return '\n'.join([
+            '_**{}**_:\n\nFrom {} to {} at {}\n\n'.format(
+                s['authorName'],
+                s['fromString'],
+                s['toString'],
+                format_jira_date(s['created'])
+            ) for s in self.get_timeline(issue_key).statuses
+        ])
+
+    def get_parsed_stories(self, raw_issues: Iterator[dict], testrail_mode: bool = False) -> list:
         """Given a collection of raw Jira stories, parses them down to JSON objects containing needed fields only.
 
-        :param raw_issues: JSON collection of stories returned from the Jira API
+        Stories hydrated by get_issues are parsed straight from the search payload, anything else is fetched once into the snapshot cache.
+        raw_issues is read a chunk at a time, and each story's snapshot is trimmed to RETAINED_FIELDS once it is parsed, so
+        the full payload of only one chunk is held at once. The parsed records themselves are all returned together.
+
+        :param raw_issues: JSON collection of stories returned from the Jira API, consumed lazily
         :param testrail_mode: Should QA dates be ignored? If they're in the release but haven't been QAed yet... yes.
         :return parsed_stories: a list of parsed stories ready for one of the reconcile methods
         """
         parsed_stories = []
 
-        for issue in raw_issues:
-            _story              = self.get_issue(issue.key,
-                                                 fields='summary,description,comment,labels,created,updated,status')
-            _testedBy           = 'unassigned'
-            _hasFailed          = False
-            _currentStatus      = self.get_current_status(_story.key)
-            _changelog          = sorted(_story.changelog.histories, key=lambda ch: ch.created, reverse=True)
-            _statuses           = self.get_statuses(_changelog)
-            _validTester        = next(filter(lambda status: status['authorName'] in self.testers, _statuses), None)
-            _testedBy           = _validTester['authorName'] if _validTester is not None else 'unassigned'
-            _url                = urljoin(self.host, 'browse/{}'.format(_story.key))
-            _labels             = self.get_labels(_story.key)
-
-            if _story.fields.summary is not None:
-                _summary = ''.join(re.findall(r'[^*`#\t\'"]', _story.fields.summary))
+        for issue in self._iter_hydrated(raw_issues):
+            _story              = self.get_snapshot(issue['key'])
+            _fields             = _story['fields']
+            _key                = _story['key']
+            _timeline           = self.get_timeline(_key)
+            _testedBy           = _timeline.tested_by
+            _currentStatus      = _timeline.current_status
+            _issueType          = _fields['issuetype']['name'].lower()
+            _url                = urljoin(self.host, 'browse/{}'.format(_key))
+            _labels             = self.get_labels(_key)
+
+            if _fields['summary'] is not None:
+                _summary = ''.join(re.findall(r'[^*`#\t\'"]', _fields['summary']))
             else:
                 _summary = ''
 
-            if _story.fields.description is not None:
-                _desc = ''.join(re.findall(r'[^*`#\t\'"]', _story.fields.description))
+            if _fields['description'] is not None:
+                _desc = ''.join(re.findall(r'[^*`#\t\'"]', _fields['description']))
             else:
                 _desc = ''
 
             if testrail_mode:
                 record = dict(
-                    jira_key                = _story.key,
+                    jira_key                = _key,
                     jira_url                = _url,
                     jira_summary            = _summary,
                     jira_desc               = _desc,
                     labels                  = _labels,
-                    jira_created            = _story.fields.created,
-                    jira_updated            = _story.fields.updated,
+                    jira_created            = _fields['created'],
+                    jira_updated            = _fields['updated'],
                     tested_by               = _testedBy,
+                    issue_type              = _issueType,
                 )
 
             else:
-                _qaStatuses     = list(filter(lambda status: status['fromString'] == 'QA Testing' or status['toString'] == 'QA Testing', _statuses))
-                _validTester    = next(filter(lambda status: status['authorName'] in self.testers, _statuses), None)
-
-                _qaDateStatus   = next(filter(
-                    lambda status: status['fromString'] == 'In Progress'
-                    and status['toString'] == 'Ready for QA Release'
-                    and _story.key not in parsed_stories, _statuses
-                ), None)
-
-                if _qaDateStatus is None:
-                    if self.is_defect(_story.key) or self.is_qa_task(_story.key):
-                        print(f'[-] Skipping defect {str(issue.key)} because parent story should exist.')
+                if _timeline.qa_ready_date is None:
+                    if _issueType in ('defect', 'qa task'):
+                        print(f'[-] Skipping defect {_key} because parent story {self.get_parent(_key)} should exist.')
+                        self.trim_snapshot(_key)
                         continue
 
-                    print(f'[!] QA date not found on {str(issue.key)}\n\tEither the issue type did not get excluded or a developer may have accidentally moved the story into QA')
-                    _movedToQaDate = dateutil.parser.parse(_story.fields.updated)
+                    print(f'[!] QA date not found on {_key}\n\tEither the issue type did not get excluded or a developer may have accidentally moved the story into QA')
+                    _movedToQaDate = parse_jira_date(_fields['updated'])
                 else:
-                    _movedToQaDate  = dateutil.parser.parse(_qaDateStatus['created'])
-
-                _hasFailed      = True if len(_qaStatuses) > 0 else False
-
-                _testedBy       = _validTester['authorName'] if _validTester is not None else 'unassigned'
-
-                _comments       = '\n'.join([
-                    '\n_**{}** at {}_:\n\n{}\n\n'.format(
-                        comment.author,
-                        dateutil.parser.parse(comment.updated).strftime('%Y-%m-%d %H:%M'),
-                        ''.join(re.findall(r'[^*`#\t\'"]', comment.body))
-                    ) for comment in sorted(_story.fields.comment.comments, key=lambda s: s.updated, reverse=True)
-                ])
+                    _movedToQaDate  = parse_jira_date(_timeline.qa_ready_date)
 
-                _statuses       = '\n'.join([
-                    '_**{}**_:\n\nFrom {} to {} at {}\n\n'.format(
-                        s['authorName'],
-                        s['fromString'],
-                        s['toString'],
-                        dateutil.parser.parse(s['created']).strftime('%Y-%m-%d %H:%M')
-                    ) for s in _statuses
-                ])
+                _hasFailed      = _timeline.has_qa_statuses
 
                 if _movedToQaDate is not None:
                     _qaDate     = _movedToQaDate.strftime('%Y-%m-%d %H:%M:%S%z')
                 else:
                     raise JiraBoardException('[!] No QA date status found')
 
-                _api_url        = urljoin(self.host, 'rest/api/2/issue/{}'.format(_story.key))
-                _hotfix         = self.is_hotfix(_story.key)
+                _api_url        = urljoin(self.host, 'rest/api/2/issue/{}'.format(_key))
+                _hotfix         = self.is_hotfix(_key)
                 _inStaging      = False
-                _attachments    = self.get_attachments(_story.key)
+                _attachments    = self.get_attachments(_key)
 
                 record = dict(
-                    jira_id                 = issue.id,
-                    jira_key                = _story.key,
+                    jira_id                 = _story['id'],
+                    jira_key                = _key,
                     jira_url                = _url,
                     jira_api_url            = _api_url,
                     jira_summary            = _summary,
                     jira_desc               = _desc,
-                    jira_created            = _story.fields.created,
-                    jira_updated            = _story.fields.updated,
+                    jira_created            = _fields['created'],
+                    jira_updated            = _fields['updated'],
                     jira_qa_date            = _qaDate,
                     tested_by               = _testedBy,
                     current_status          = _currentStatus,
                     has_failed              = _hasFailed,
                     in_staging              = _inStaging,
                     is_hotfix               = _hotfix,
-                    comments                = _comments,
-                    statuses                = _statuses,
+                    issue_type              = _issueType,
                     labels                  = _labels,
                     attachments             = _attachments,
                     last_known_commit_date  = None,
                     git_commit_message      = None,
                 )
 
+            self.trim_snapshot(_key)
             parsed_stories.append(record)
 
         if testrail_mode:
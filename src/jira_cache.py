@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import json
+import os
+
+
+class JiraMetadataCache(object):
+
+    def __init__(self, cache_path: str, ttl: int = 3600):
+        """Initialize the JiraMetadataCache object.
+
+        A small JSON file of raw Jira board, sprint, project and filter data, so a cold start doesn't have to ask Jira for
+        things that rarely change.
+
+        :param cache_path: path to the JSON cache file
+        :param ttl: seconds an entry stays fresh
+        """
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._entries = None
+
+    def _load(self) -> dict:
+        """Read the cache file the first time it is needed.
+
+        :return: every cached entry, fresh or not
+        """
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path, 'r', encoding='utf-8') as cache_file:
+                        self._entries = json.loads(cache_file.read())
+                except (OSError, ValueError):
+                    print('[!] Jira metadata cache is unreadable, ignoring it.')
+        return self._entries
+
+    def get(self, key: str) -> dict or None:
+        """Get a cached value if it is younger than the TTL.
+
+        :param key: cache key
+        :return: the raw cached value, otherwise None
+        """
+        entry = self._load().get(key)
+        if entry is None or time.time() - entry['saved'] > self.ttl:
+            return None
+        return entry['value']
+
+    def set(self, key: str, value: dict) -> None:
+        """Cache a value and write the cache file.
+
+        :param key: cache key
+        :param value: raw JSON-serializable value
+        """
+        self._load()[key] = dict(saved=time.time(), value=value)
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as cache_file:
+                cache_file.write(json.dumps(self._entries))
+        except OSError:
+            print('[!] Unable to write Jira metadata cache to {}'.format(self.cache_path))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from src.exceptions import JiraBoardException
+from concurrent.futures import Future
+import re
+
+
+# Keys that are safe to put in a 'key in (...)' clause. Anything else is looked up on its own
+ISSUE_KEY_PATTERN = re.compile(r'^[A-Z][A-Z0-9_]*-\d+$')
+
+
+class JiraIssueLoader(object):
+
+    def __init__(self, jira_board, batch_size: int = 100):
+        """Initialize the JiraIssueLoader object.
+
+        Collects single-story lookups made during a reconcile phase and answers them with one 'key in (...)' search per
+        batch_size keys when dispatch() is called, instead of one request per story.
+
+        :param jira_board: the JiraBoard whose snapshot cache the loaded stories go into
+        :param batch_size: maximum number of keys per search
+        """
+        self.jira_board = jira_board
+        self.batch_size = batch_size
+        self._queue = {}
+
+    def load(self, issue_key: str, fields: str = 'status', changelog: bool = True) -> Future:
+        """Ask for a story to be loaded on the next dispatch.
+
+        :param issue_key: a Jira story key
+        :param fields: comma-separated fields the caller reads
+        :param changelog: True if the caller reads the changelog
+        :return: a Future that resolves to the story's snapshot, already resolved if the snapshot cache has what is needed
+        """
+        missing, needs_changelog = self.jira_board.snapshot_gaps(issue_key, fields, changelog)
+        if len(missing) == 0 and not needs_changelog:
+            future = Future()
+            future.set_result(self.jira_board.get_snapshot(issue_key, fields=fields, changelog=changelog))
+            return future
+
+        batch = self._queue.setdefault((fields, changelog), {})
+        if issue_key not in batch:
+            batch[issue_key] = Future()
+        return batch[issue_key]
+
+    def load_many(self, issue_keys: list, fields: str = 'status', changelog: bool = True) -> list:
+        """Ask for several stories to be loaded on the next dispatch.
+
+        :param issue_keys: a list of Jira story keys
+        :param fields: passed through to load
+        :param changelog: passed through to load
+        :return: a list of Futures in the same order as issue_keys
+        """
+        return [self.load(key, fields, changelog) for key in issue_keys]
+
+    def dispatch(self) -> None:
+        """Resolve every queued lookup, one search per batch of keys that share the same fields.
+
+        A batch the search can't answer (usually because one of the keys no longer exists) falls back to single lookups,
+        so one bad key only fails its own Future.
+        """
+        queue, self._queue = self._queue, {}
+        for (fields, changelog), batch in queue.items():
+            keys = [key for key in batch if ISSUE_KEY_PATTERN.match(key)]
+            for i in range(0, len(keys), self.batch_size):
+                self._resolve_batch(keys[i:i + self.batch_size], batch, fields, changelog)
+            for key in batch:
+                if not batch[key].done():
+                    self._resolve_one(key, batch[key], fields, changelog)
+
+    def _resolve_batch(self, keys: list, batch: dict, fields: str, changelog: bool) -> None:
+        """Load a batch of keys with a single search and resolve their Futures.
+
+        The query isn't validated, so a deleted or moved key only drops out of the results instead of failing the batch.
+
+        :param keys: Jira story keys to search for
+        :param batch: Futures keyed by story key
+        :param fields: comma-separated fields to request
+        :param changelog: True if the changelog should be expanded
+        """
+        jql = 'key in ({})'.format(','.join(keys))
+        try:
+            issues = list(self.jira_board.iter_jql(jql, page_size=len(keys), fields=fields, expand='changelog' if changelog else None,
+                                                   what='batch load Jira issues', validate_query=False))
+        except JiraBoardException:
+            return
+        for issue in issues:
+            future = batch.get(issue['key'])
+            if future is not None and not future.done():
+                future.set_result(self.jira_board.merge_snapshot(issue, fields))
+
+    def _resolve_one(self, issue_key: str, future: Future, fields: str, changelog: bool) -> None:
+        """Load a single story and resolve its Future, or fail it if the story can't be fetched.
+
+        :param issue_key: a Jira story key
+        :param future: the Future handed out for the key
+        :param fields: passed through to get_snapshot
+        :param changelog: passed through to get_snapshot
+        """
+        try:
+            future.set_result(self.jira_board.get_snapshot(issue_key, fields=fields, changelog=changelog))
+        except JiraBoardException as error:
+            future.set_exception(error)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from src.exceptions import DbException
+from util import jira_db_setup
+import sqlite3
+import json
+
+
+class JiraIssueStore(object):
+
+    def __init__(self, db_path: str):
+        """Initialize the JiraIssueStore object.
+
+        Keeps raw Jira issues, with their status-transition history in the expanded changelog, in the sqlite database next to the commits table, so each run only has to download stories that changed since the last sync.
+
+        :param db_path: path to the sqlite (.db) file
+        """
+        if not db_path or db_path is None:
+            raise DbException('[!] Database path required for this operation')
+
+        # existing commit databases predate the store, so make sure its tables are there
+        jira_db_setup(db_path)
+        self.db_path = db_path
+
+    def _execute(self, sql: str, values: tuple = ()) -> list:
+        """Run a statement against the store and return any rows it produced.
+
+        :param sql: SQL statement
+        :param values: parameters for the statement
+        :return: a list of result rows
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(sql, values)
+            rows = cursor.fetchall()
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as sqle:
+            print(sqle)
+            raise DbException('[!] Jira issue store operation failed.')
+        return rows
+
+    def get_issue(self, issue_key: str) -> dict or None:
+        """Get the raw JSON of a stored issue.
+
+        :param issue_key: a Jira story key
+        :return: the issue as returned by the Jira API, otherwise None
+        """
+        rows = self._execute('SELECT raw FROM jira_issues WHERE issue_key = (?)', (issue_key,))
+        return json.loads(rows[0][0]) if len(rows) > 0 else None
+
+    def get_issues(self, issue_keys: list) -> dict:
+        """Get the raw JSON of several stored issues at once.
+
+        :param issue_keys: a list of Jira story keys
+        :return: a dict of raw issues keyed by issue key. Keys that are not stored are left out
+        """
+        issues = {}
+        keys = list(issue_keys)
+        # stay under sqlite's default limit on bound parameters
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            sql = 'SELECT issue_key, raw FROM jira_issues WHERE issue_key IN ({})'.format(','.join('?' * len(chunk)))
+            issues.update({r[0]: json.loads(r[1]) for r in self._execute(sql, tuple(chunk))})
+        return issues
+
+    def store_issue(self, raw: dict) -> None:
+        """Insert or replace an issue and its status-transition history.
+
+        :param raw: the issue as returned by the Jira API, with the changelog expanded
+        """
+        fields = raw.get('fields', {})
+        self._execute('INSERT OR REPLACE INTO jira_issues (issue_key, issue_id, updated, raw) VALUES((?),(?),(?),(?))',
+                      (raw['key'], raw.get('id'), fields.get('updated'), json.dumps(raw)))
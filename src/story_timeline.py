@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+class StoryTimeline(object):
+
+    __slots__ = (
+        'key',
+        'current_status',
+        'status_category',
+        'statuses',
+        'tested_by',
+        'qa_ready_date',
+        'failure_count',
+        'has_qa_statuses',
+        'for_qa_team',
+    )
+
+    def __init__(self, issue: dict, testers: frozenset):
+        """Compile the status history of a Jira story into every QA flag the reconcilers use.
+
+        The changelog is walked once, newest change first, and nothing is recomputed afterwards.
+
+        :param issue: a raw Jira story dict with its status and changelog
+        :param testers: display names and Jira account ids of the QA testers
+        """
+        status                  = issue['fields']['status']
+        self.key                = issue['key']
+        self.current_status     = status['name']
+        self.status_category    = status['statusCategory']['name']
+        self.statuses           = []
+        self.tested_by          = 'unassigned'
+        self.qa_ready_date      = None
+        self.failure_count      = 0
+        self.has_qa_statuses    = False
+        self.for_qa_team        = False
+
+        for ch in sorted(issue['changelog']['histories'], key=lambda h: h['created'], reverse=True):
+            item = ch['items'][0]
+            if item['field'].lower() != 'status':
+                continue
+
+            status = dict(
+                authorName  = ch['author']['displayName'],
+                created     = ch['created'],
+                fromString  = item['fromString'],
+                toString    = item['toString']
+            )
+            self.statuses.append(status)
+            by_tester = status['authorName'] in testers or ch['author'].get('accountId') in testers
+
+            if by_tester and self.tested_by == 'unassigned':
+                self.tested_by = status['authorName']
+
+            if self.qa_ready_date is None and status['fromString'] == 'In Progress' and status['toString'] == 'Ready for QA Release':
+                self.qa_ready_date = status['created']
+
+            if status['fromString'] == 'QA Testing' or status['toString'] == 'QA Testing':
+                self.has_qa_statuses = True
+
+            if by_tester and status['fromString'] == 'QA Testing' and status['toString'] == 'In Progress':
+                self.failure_count += 1
+
+            if by_tester and 'qa release' in status['fromString'].lower() and 'qa testing' in status['toString'].lower():
+                self.for_qa_team = True
+
+    @property
+    def has_failed_qa(self) -> bool:
+        """True if a tester has ever moved the story from QA Testing back to In Progress."""
+        return self.failure_count > 0
+
+    @property
+    def has_complete_status(self) -> bool:
+        """True if the story's current status category is 'Done'."""
+        return self.status_category == 'Done'
+
+    @property
+    def passed_qa(self) -> bool:
+        """True if the story is complete and a tester touched it along the way."""
+        return self.has_complete_status and self.tested_by != 'unassigned'
+
+    @property
+    def is_fresh_qa_ready(self) -> bool:
+        """True if the story is 'Ready for QA Release' and has never failed QA."""
+        return self.current_status == 'Ready for QA Release' and not self.has_failed_qa
+
+    @property
+    def is_stale_qa_ready(self) -> bool:
+        """True if the story is 'Ready for QA Release' after failing QA at least once."""
+        return self.current_status == 'Ready for QA Release' and self.has_failed_qa
+
+    @property
+    def is_in_qa_testing(self) -> bool:
+        """True if the story is currently in 'QA Testing'."""
+        return self.current_status == 'QA Testing'
+
+    @property
+    def is_currently_failed(self) -> bool:
+        """True if the story is currently back in development."""
+        return self.current_status in ('In Progress', 'Backlog')
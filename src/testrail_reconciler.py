@@ -71,7 +71,7 @@ class TestRailReconciler(object):
         :return: the board if it exists, None if not
         """
         if key is None:
-            key = self.jira.get_project()
+            return self.jira.board
         return self.jira.get_board(key)
 
     def get_current_jira_sprint(self, board_id: int) -> Sprint:
@@ -80,6 +80,8 @@ class TestRailReconciler(object):
         :param board_id: board ID of the Jira board
         :return: the current sprint if one exists that matches criteria
         """
+        if board_id == self.jira.board.id:
+            return self.jira.current_sprint
         return self.jira.get_current_sprint(board_id)
 
     def get_jira_stories(self, filter_id: int) -> list:
@@ -321,8 +323,11 @@ class TestRailReconciler(object):
         current_testruns = self.get_testrail_testruns(self.testrail_project['id'])
         current_testrun_names = [tr['name'] for tr in current_testruns]
 
+        # one JQL query per 100 stories instead of a changelog download per story
+        for_qa = self.jira.for_qa_team_keys([story['jira_key'] for story in new_story_sections])
+
         for story in new_story_sections:
-            if not self.is_for_qa(story['jira_key']):
+            if story['jira_key'] not in for_qa:
                 # ignore the story if a QA tester didn't test it
                 continue
 
@@ -371,6 +376,7 @@ class TestRailReconciler(object):
             raise TestRailReconcilerException('[!] Test run data required.')
 
         parent_story = None
+        defects = []
 
         # result algorithm
         for f in self.failed:
@@ -422,8 +428,11 @@ class TestRailReconciler(object):
                 }
             }
 
-            # add the subtask to Jira
-            self.jira.jira.create_issue(fields=fields)
+            defects.append(fields)
+
+        # add the subtasks to Jira in bulk rather than one request per failure
+        if len(defects) > 0:
+            self.jira.create_issues(defects)
 
     def complete_jira_subtask(self, jira_story: str) -> None:
         """ TODO """
@@ -447,4 +456,4 @@ class TestRailReconciler(object):
 
             # trigger staging transition
             _staging_transition_id = 1011
-            self.jira.jira.transition_issue(jira_story, transition=_staging_transition_id)
+            self.jira.transition_issue(jira_story, _staging_transition_id)
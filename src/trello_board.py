@@ -9,6 +9,10 @@ import sys
 import os
 
 
+# Only the card fields get_cards_from_lists keeps
+CARD_FIELDS = 'name,desc,pos,idList,idLabels,idMembers'
+
+
 class TrelloBoard(object):
 
     def __init__(self, config: dict, testMode: bool  = False) -> None:
@@ -71,6 +75,30 @@ class TrelloBoard(object):
         else:
             return result
 
+    def get_nested_board(self, board_id: str) -> dict:
+        """Given a board_id, retrieve a Trello board with its open lists and cards, labels and members in one request.
+
+        :param board_id: board_id of a Trello board
+        :return: JSON representation of a Trello board with 'lists', 'cards', 'labels' and 'members' nested in it
+        """
+        try:
+            result = self.trello.boards.get(
+                board_id=board_id,
+                fields='name,url',
+                lists='open',
+                list_fields='name,pos',
+                cards='open',
+                card_fields=CARD_FIELDS,
+                labels='all',
+                labels_limit=1000,
+                members='all'
+            )
+        except HTTPError as httpe:
+            print('[!] {}: Unable to get Trello board.'.format(httpe.response.status_code))
+            raise TrelloBoardException
+        else:
+            return result
+
     def get_trello_lists(self, board_id: str) -> dict:
         """Get all lists attached to a Trello board.
 
@@ -150,15 +178,25 @@ class TrelloBoard(object):
         card_id_list = self.get_trello_card_list(card_id)
         return card_id_list.get('name') if card_id_list is not None else None
 
-    def get_cards_from_lists(self, lists: dict) -> list:
+    def get_cards_from_lists(self, lists: dict, cards: list = None) -> list:
         """Given a list of Trello lists, get data for all card on each list.
 
         :param lists: a list of lists to grab cards from.
+        :param cards: cards already fetched with the board. If None, each list's cards are requested separately
         :return tmp: a list of dictionaries representing cards from lists
         """
+        by_list = None
+        if cards is not None:
+            by_list = {}
+            for card in sorted(cards, key=lambda c: c.get('pos')):
+                by_list.setdefault(card.get('idList'), []).append(card)
+
         tmp = []
         for trello_list in lists:
-            trello_cards = self.get_cards_from_list(trello_list.get('id'))
+            if by_list is not None:
+                trello_cards = by_list.get(trello_list.get('id'), [])
+            else:
+                trello_cards = self.get_cards_from_list(trello_list.get('id'))
             # check if trello_cards is None or zero before trying to add them to tmp
             if len(trello_cards) > 0:
                 for card in trello_cards:
@@ -268,6 +306,14 @@ class TrelloBoard(object):
         else:
             return list(filter(lambda card: card['idList'] != self.completeListId, board_cards))
 
+    def get_settled_card_names(self) -> list:
+        """Get the names of cards that are done with QA, on the 'Complete' list or the archive board.
+
+        :return: a list of card names
+        """
+        complete = [card['name'] for card in self.cards if card['listID'] == self.completeListId]
+        return complete + [card['name'] for card in self.get_board_cards(self.archive_board_id)]
+
     def add_new_card(self, card_name: str, card_list_id: str, pos: int or str, card_desc: str) -> dict:
         """Add a new Trello card to a list on the board.
 
@@ -467,10 +513,14 @@ class TrelloBoard(object):
     def populate(self) -> None:
         """Populate the things declared in __init__."""
 
-        self.board = self.get_trello_board(self.board_id)
-        self.lists = self.get_trello_lists(self.board_id)
-        self.labels = self.get_board_labels(self.board_id)
-        self.members = self.get_board_members(self.board_id)
+        # one nested request instead of separate board, lists, labels, members and per-list card calls
+        self.board = self.get_nested_board(self.board_id)
+        cards = None
+        if self.board is not None:
+            self.lists = self.board.pop('lists', None)
+            self.labels = self.board.pop('labels', None)
+            self.members = self.board.pop('members', None)
+            cards = self.board.pop('cards', None)
 
         if self.board is None:
             print('[!] TrelloBoard initialization failed: Unable to grab board from Trello')
@@ -488,5 +538,5 @@ class TrelloBoard(object):
             print('[!] TrelloBoard initialization failed: Unable to grab board members from Trello')
             sys.exit(-1)
 
-        self.cards = self.get_cards_from_lists(self.lists)
+        self.cards = self.get_cards_from_lists(self.lists, cards)
         self.cardCount = len([card for card in self.cards if card['listID'] != self.completeListId])
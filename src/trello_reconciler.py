@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 from src.exceptions import TrelloReconcilerException
 from src.trello_board import TrelloBoard
-from src.jira_board import JiraBoard
+from src.jira_board import JiraBoard, QA_EXCLUDED_TYPES
 from src.gitlab_log import GitLabLog
 from util import get_configs
 import sys
@@ -12,12 +12,13 @@ import re
 
 class TrelloReconciler(object):
 
-    def __init__(self, jira: JiraBoard, git: GitLabLog, trello: TrelloBoard, config: dict) -> None:
+    def __init__(self, jira: JiraBoard, git: GitLabLog, trello: TrelloBoard, config: dict, populate: bool = True) -> None:
         """Initialize the TrelloReconciler object to reconcile the differences between git, Jira and Trello so that team members working from a Trello project board can adhere to GitFlow while putting development items through QA
 
         :param jira: instance of JiraBoard
         :param git: instance of GitLog
         :param trello: instance of TrelloBoard
+        :param populate: if False, skip loading the QA filters, e.g. when only reconcile_story will be called
         """
         print('[+] Initializing TrelloReconciler object')
 
@@ -50,13 +51,16 @@ class TrelloReconciler(object):
         self._testrail_url          = config['testcase_url']
 
         # 2 stage initialization, ready go!
-        self.populate()
+        if populate:
+            self.populate()
 
     def populate(self) -> None:
         """Seocnd stage of reconciler initialization."""
         try:
-            self.jira_qa_statuses = self.jira.get_parsed_stories(self.jira.get_issues(self.filter_qa_status))
-            self.jira_qa_ready = self.jira.get_parsed_stories(self.jira.get_issues(self.filter_qa_ready))
+            # both filters overlap heavily, so fetch and parse their union once and share it across every phase
+            stories = self.jira.get_tagged_stories([self.filter_qa_status, self.filter_qa_ready], exclude_types=QA_EXCLUDED_TYPES)
+            self.jira_qa_statuses = [s for s in stories if self.filter_qa_status in s['filters']]
+            self.jira_qa_ready = [s for s in stories if self.filter_qa_ready in s['filters']]
         except TrelloReconcilerException:
             raise TrelloReconcilerException
 
@@ -79,6 +83,30 @@ class TrelloReconciler(object):
         # Or maybe the list sorting should happen here?
         # self.trello_sort_lists()
 
+    def reconcile_story(self, issue_key: str) -> None:
+        """Reconcile a single Jira story against the Trello board, e.g. when a Jira webhook reports it changed.
+
+        Only the story itself is fetched from Jira, and filter membership is checked with one key-scoped query per filter.
+
+        :param issue_key: a Jira story key
+        """
+        stories = self.jira.get_parsed_stories([dict(key=issue_key)])
+        story = stories[0] if len(stories) > 0 else None
+        in_qa_status = story is not None and self.jira.in_filter(issue_key, self.filter_qa_status, QA_EXCLUDED_TYPES)
+        in_qa_ready = story is not None and self.jira.in_filter(issue_key, self.filter_qa_ready, QA_EXCLUDED_TYPES)
+
+        self.jira_qa_statuses = [story] if in_qa_status else []
+        self.trello_updateCurrentCards(card_names=[issue_key])
+        self._old_card_names = self.trello_getOldLists()
+
+        # a story that just became ready sorts after everything already waiting in To Do
+        self.jira_qa_ready = [dict(jira_key=card.get('name')) for card in self.old_qa_ready_cards]
+        if in_qa_ready:
+            self.jira_qa_ready.append(story)
+
+        self.trello_setNewLists(self.jira_qa_statuses)
+        self.trello_addCardsToBoard()
+
     # Trello methods
     def trello_getOldFailed(self) -> dict:
         """Get a list of pre-reconcile Trello cards currently in the 'Failed' list.
@@ -265,10 +293,22 @@ class TrelloReconciler(object):
         self._changed.append(trello_card.get('name'))
         self.trello.copy_card(trello_card.get('id'), destination_list_id)
 
-    def trello_updateCurrentCards(self) -> None:
-        """Update existing Trello cards if the state of the Jira stories they represent has changed."""
+    def trello_updateCurrentCards(self, card_names: list = None) -> None:
+        """Update existing Trello cards if the state of the Jira stories they represent has changed.
+
+        :param card_names: if given, only update the cards with these names
+        """
         print('[+] Checking for existing card updates')
         cardList = list(filter(lambda t: self.jira.project_key in t.get('name') and t.get('listID') in [self.other_listID, self.todo_listID, self.failed_listID, self.testing_listID], self.trello.cards))
+        if card_names is not None:
+            cardList = [card for card in cardList if card.get('name') in card_names]
+
+        # load every card's story in batches up front so the checks below don't hit Jira one card at a time
+        self.jira.loader.load_many([card.get('name') for card in cardList], fields='status,labels')
+        self.jira.loader.dispatch()
+        # the 'defect' label needs each story's children
+        self.jira.index_children([card.get('name') for card in cardList])
+
         for card in cardList:
 
             jira    = next(filter(lambda j: j.get('jira_key') == card.get('name'), self.jira_qa_statuses), None)
@@ -344,21 +384,21 @@ class TrelloReconciler(object):
         jira_stories = [story for story in sorted(new_stories, key=lambda story: story.get('jira_qa_date')) if
                         story.get('jira_key') not in self._old_card_names]
 
+        self.jira.loader.load_many([story.get('jira_key') for story in jira_stories])
+        self.jira.loader.dispatch()
+
         for story in jira_stories:
             # shouldn't happen by this point, but just in case...
             if self.jira_passedQA(story.get('jira_key')):
                 self.trello_addToList(story, self.complete_listID)
                 continue
 
-            if self.jira_isDefect(story.get('jira_key')):
-                # don't add a card if it's a defect
+            # defects and QA tasks are normally filtered out by the query, but the type came back with the story anyway
+            if story.get('issue_type') in ('defect', 'qa task'):
+                # don't add a card if it's a defect or a QA task
                 continue
 
-            if self.jira_isQaTask(story.get('jira_key')):
-                # ... or a QA task
-                continue
-
-            if self.jira_isBug(story.get('jira_key')) and 'AMB-' in story.get('jira_key'):
+            if story.get('issue_type') == 'bug' and 'AMB-' in story.get('jira_key'):
                 self.trello_addToList(story, self.other_listID, top_of_list=True)
                 continue
 
@@ -366,11 +406,11 @@ class TrelloReconciler(object):
                 self.trello_addToList(story, self.testing_listID)
                 continue
 
-            if self.jira_isFreshHotfix(story.get('jira_key')):
+            if story.get('is_hotfix') and self.jira_isFreshQaReady(story.get('jira_key')):
                 self.trello_addToList(story, self.other_listID)
                 continue
 
-            if self.jira_isStaleHotfix(story.get('jira_key')):
+            if story.get('is_hotfix') and self.jira_isStaleQAReady(story.get('jira_key')):
                 self.trello_addToList(story, self.todo_listID, top_of_list=True)
                 continue
 
@@ -428,12 +468,10 @@ class TrelloReconciler(object):
             jira_url            = jira_story['jira_url'],
             jira_summary        = jira_story['jira_summary'],
             jira_desc           = jira_story['jira_desc'],
-            comments            = jira_story['comments'],
             labels              = jira_story['labels'],
             tested_by           = jira_story['tested_by'],
             current_status      = jira_story['current_status'],
             has_failed          = jira_story['has_failed'],
-            statuses            = jira_story['statuses'],
             jira_attachments    = jira_story['attachments'],
             testrail_url        = self._testrail_url
         )
@@ -443,9 +481,11 @@ class TrelloReconciler(object):
 
     def trello_addCardsToBoard(self) -> None:
         """Actually add cards from the new card list to the Trello board"""
-        stories         = self.jira.get_parsed_stories(self.jira.get_issues(self.filter_qa_ready))
         old_qa_ready    = [li['name'] for li in self.old_qa_ready_cards]
-        new_qa_ready    = [s['jira_key'] for s in stories]
+        new_qa_ready    = [s['jira_key'] for s in self.jira_qa_ready]
+
+        # the 'defect' label needs each new story's children
+        self.jira.index_children([card['jira_key'] for card in self.new_cards if card['jira_key'] not in self._old_card_names])
 
         for card in self.new_cards:
             if card['jira_key'] not in self._old_card_names:
@@ -482,14 +522,15 @@ class TrelloReconciler(object):
 
                         card['pos'] = self._last_card_pos
 
+                # comments and status history are only rendered for cards that actually get created
                 desc = '**{}**\n\n**Ready for QA on:** {}\n[**Jira Link**]({})\n\n[**TestRail Link**]({})\n\n---\n\n{}\n\n---\n\nJIRA COMMENTS\n\n{}\n\n---\n\nJIRA STATUS CHANGES\n\n{}'.format(
                             card['jira_summary'],
                             card['date'],
                             card['jira_url'],
                             card['testrail_url'],
                             card['jira_desc'],
-                            card['comments'],
-                            card['statuses']
+                            self.jira.render_comments(card['jira_key']),
+                            self.jira.render_statuses(card['jira_key'])
                 )
 
                 if len(desc) > 16384:
@@ -547,30 +588,6 @@ class TrelloReconciler(object):
     def jira_initializeData(self):
         raise NotImplementedError
 
-    def jira_isHotfix(self, jira_key: str) -> bool:
-        """Return True if item is a hotfix.
-
-        :param jira_key: jira_key of the story we want to check
-        :return boolean:
-        """
-        return self.jira.is_hotfix(jira_key)
-
-    def jira_isFreshHotfix(self, jira_key: str) -> bool:
-        """Return True if item is a hotfix, is ready for QA, and has NOT previously failed testing.
-
-        :param jira_key: jira_key of the story we want to check
-        :return boolean:
-        """
-        return self.jira_isHotfix(jira_key) and self.jira_isFreshQaReady(jira_key)
-
-    def jira_isStaleHotfix(self, jira_key: str) -> bool:
-        """Return True if item is a hotfix, is ready for QA and HAS previously failed testing.
-
-        :param jira_key: jira_key of the story we want to check
-        :return boolean:
-        """
-        return self.jira_isHotfix(jira_key) and self.jira_isStaleQAReady(jira_key)
-
     def jira_isFreshQaReady(self, jira_key: str) -> bool:
         """Return True if item is ready for QA, and has NOT previously failed testing.
 
@@ -632,35 +649,10 @@ class TrelloReconciler(object):
         """
         return jira_key not in self._old_card_names
 
-    def jira_isDefect(self, jira_key: str) -> bool:
-        """Return True if it is a defect issuetype.
-
-        :param jira_key:
-        :return:
-        """
-        return self.jira.is_defect(jira_key)
-
-    def jira_isQaTask(self, jira_key: str) -> bool:
-        """Return True if it is a defect issuetype.
-
-        :param jira_key:
-        :return:
-        """
-        return self.jira.is_qa_task(jira_key)
-
-    def jira_isBug(self, jira_key: str) -> bool:
-        """Return True if it is a Bug issuetype.
-
-        :param jira_key:
-        :return:
-        """
-        return self.jira.is_bug(jira_key)
-
     def jira_hasSubtasks(self, jira_key: str) -> bool:
         """Return True if it is a story has subtasks.
 
         :param jira_key:
         :return:
         """
-        issue = self.jira.get_issue(jira_key, 'subtasks')
-        return len(issue.fields.subtasks) > 0
+        return self.jira.has_subtasks(jira_key)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from src.gitlab_log import GitLabLog
-from util import is_db_init, gitlab_db_setup
+from util import is_db_init, gitlab_db_setup, jira_db_setup
 
 import configparser
 import sqlite3
@@ -44,6 +44,7 @@ def main():
         sys.exit(-1)
 
     gitlab_db_setup(gitlab_config["db_path"])
+    jira_db_setup(gitlab_config["db_path"])
     gl = GitLabLog(gitlab_config)
 
     try:
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from util import parse_jira_date, format_jira_date
+from datetime import datetime, timedelta
+import dateutil.parser
+import random
+import timeit
+
+usage = "Run this file in the root directory:" \
+        "python -m task_scripts.jira.benchmark_dates"
+
+
+def sample_timestamps(count: int, distinct: int) -> list:
+    """Build Jira-style timestamps with some repetition, like the created/updated values seen during a reconcile.
+
+    :param count: number of timestamps
+    :param distinct: number of different timestamps among them
+    :return: a list of timestamp strings
+    """
+    start = datetime(2020, 1, 1)
+    pool = [(start + timedelta(minutes=random.randint(0, 500000))).strftime('%Y-%m-%dT%H:%M:%S.000-0400') for _ in range(distinct)]
+    return [random.choice(pool) for _ in range(count)]
+
+
+def main():
+    timestamps = sample_timestamps(20000, 5000)
+
+    def run_dateutil():
+        for t in timestamps:
+            dateutil.parser.parse(t).strftime('%Y-%m-%d %H:%M')
+
+    def run_uncached():
+        parse_jira_date.cache_clear()
+        format_jira_date.cache_clear()
+        for t in timestamps:
+            parse_jira_date.__wrapped__(t).strftime('%Y-%m-%d %H:%M')
+
+    def run_cached():
+        parse_jira_date.cache_clear()
+        format_jira_date.cache_clear()
+        for t in timestamps:
+            format_jira_date(t)
+
+    results = [
+        ('dateutil.parser.parse', min(timeit.repeat(run_dateutil, number=1, repeat=3))),
+        ('parse_jira_date (no memo)', min(timeit.repeat(run_uncached, number=1, repeat=3))),
+        ('format_jira_date (memo)', min(timeit.repeat(run_cached, number=1, repeat=3))),
+    ]
+
+    print('[+] Parsing and formatting {} timestamps ({} distinct)'.format(len(timestamps), len(set(timestamps))))
+    baseline = results[0][1]
+    for name, seconds in results:
+        print('\t{:<28} {:8.1f} ms  {:5.1f}x'.format(name, seconds * 1000, baseline / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from src.jira_board import JiraBoard
+
+from jira import JIRAError
+from requests.exceptions import ConnectionError
+from unittest import TestCase, mock
+from threading import local
+from datetime import datetime, timedelta, timezone
+
+
+class FakeResponse(object):
+
+    def __init__(self, headers: dict = None):
+        self.headers = headers or {}
+
+
+def jira_error(status_code: int, headers: dict = None) -> JIRAError:
+    return JIRAError(status_code=status_code, text='error', response=FakeResponse(headers))
+
+
+def retrying_board(retry_max_seconds: float = 120, retry_base_delay: float = 1) -> JiraBoard:
+    """A JiraBoard with only what the retry policy reads, so no Jira server is needed."""
+    board = object.__new__(JiraBoard)
+    board.retry_max_seconds = retry_max_seconds
+    board.retry_base_delay = retry_base_delay
+    board._call_site = local()
+    return board
+
+
+class TestJiraRetry(TestCase):
+
+    """
+    positive tests for retry_delay
+    """
+    def test_retry_delay_full_jitter(self):
+        board = retrying_board(retry_base_delay=1)
+        with mock.patch('src.jira_board.random.uniform', side_effect=lambda low, high: high) as uniform:
+            self.assertEqual(board.retry_delay(jira_error(503), 1), 2)
+            self.assertEqual(board.retry_delay(jira_error(503), 3), 8)
+            # the backoff is capped at a minute
+            self.assertEqual(board.retry_delay(jira_error(503), 10), 60)
+            self.assertTrue(all(call.args[0] == 0 for call in uniform.call_args_list))
+
+    def test_retry_delay_retry_after_seconds(self):
+        board = retrying_board()
+        with mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertEqual(board.retry_delay(jira_error(429, {'Retry-After': '30'}), 1), 30)
+
+    def test_retry_delay_retry_after_date(self):
+        board = retrying_board()
+        retry_at = (datetime.now(timezone.utc) + timedelta(seconds=90)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+        with mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertAlmostEqual(board.retry_delay(jira_error(429, {'Retry-After': retry_at}), 1), 90, delta=2)
+
+    def test_retry_delay_rate_limit_reset(self):
+        board = retrying_board()
+        reset = (datetime.now(timezone.utc) + timedelta(seconds=45)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        with mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertAlmostEqual(board.retry_delay(jira_error(429, {'X-RateLimit-Reset': reset}), 1), 45, delta=2)
+
+    def test_retry_delay_header_never_shortens_backoff(self):
+        board = retrying_board()
+        with mock.patch('src.jira_board.random.uniform', return_value=5):
+            self.assertEqual(board.retry_delay(jira_error(429, {'Retry-After': '1'}), 1), 5)
+
+    def test_retry_delay_connection_error(self):
+        board = retrying_board()
+        with mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertEqual(board.retry_delay(ConnectionError(), 1), 0.5)
+
+    def test_retry_delay_write_rate_limited(self):
+        board = retrying_board()
+        with mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertEqual(board.retry_delay(jira_error(429), 1, idempotent=False), 0.5)
+
+    """
+    negative tests for retry_delay
+    """
+    def test_retry_delay_client_error(self):
+        board = retrying_board()
+        for status_code in (400, 401, 403, 404):
+            self.assertIsNone(board.retry_delay(jira_error(status_code), 1))
+
+    def test_retry_delay_write_server_error(self):
+        board = retrying_board()
+        self.assertIsNone(board.retry_delay(jira_error(503), 1, idempotent=False))
+        self.assertIsNone(board.retry_delay(ConnectionError(), 1, idempotent=False))
+
+    def test_retry_delay_bad_header(self):
+        board = retrying_board()
+        with mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertEqual(board.retry_delay(jira_error(429, {'Retry-After': 'soon'}), 1), 0.5)
+
+    """
+    positive tests for call_jira
+    """
+    def test_call_jira_retries_until_success(self):
+        board = retrying_board()
+        func = mock.Mock(side_effect=[jira_error(429), jira_error(502), 'issue'])
+        with mock.patch('src.jira_board.time.sleep') as sleep, mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertEqual(board.call_jira('get Jira issue', func, 'MMDH-1', fields='status'), 'issue')
+        self.assertEqual(func.call_count, 3)
+        func.assert_called_with('MMDH-1', fields='status')
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_call_jira_retries_rate_limited_write(self):
+        board = retrying_board()
+        func = mock.Mock(side_effect=[jira_error(429), 'created'])
+        with mock.patch('src.jira_board.time.sleep'), mock.patch('src.jira_board.random.uniform', return_value=0.5):
+            self.assertEqual(board.call_jira('create Jira issue', func, idempotent=False), 'created')
+        self.assertEqual(func.call_count, 2)
+
+    """
+    negative tests for call_jira
+    """
+    def test_call_jira_does_not_repeat_failed_write(self):
+        board = retrying_board()
+        func = mock.Mock(side_effect=[jira_error(500), 'created'])
+        with mock.patch('src.jira_board.time.sleep') as sleep:
+            self.assertIsNone(board.call_jira('bulk create Jira issues', func, idempotent=False))
+        self.assertEqual(func.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_call_jira_gives_up_at_deadline(self):
+        board = retrying_board(retry_max_seconds=10)
+        func = mock.Mock(side_effect=jira_error(429, {'Retry-After': '30'}))
+        with mock.patch('src.jira_board.time.sleep') as sleep:
+            self.assertIsNone(board.call_jira('get Jira issue', func))
+        self.assertEqual(func.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_call_jira_clears_call_site(self):
+        board = retrying_board()
+        board.call_jira('get Jira issue', mock.Mock(return_value='issue'))
+        self.assertIsNone(board._call_site.what)
+
+
+class TestLocalStatusFilter(TestCase):
+
+    def setUp(self):
+        self.board = object.__new__(JiraBoard)
+
+    """
+    positive tests for local_status_filter
+    """
+    def test_local_status_filter_statuses(self):
+        result = self.board.local_status_filter('(status in ("QA Testing", \'Ready for QA Release\')) ORDER BY updated')
+        self.assertEqual(result, (None, frozenset(['qa testing', 'ready for qa release'])))
+
+    def test_local_status_filter_projects(self):
+        result = self.board.local_status_filter('project in (amb, MMDH) AND status = "QA Testing"')
+        self.assertEqual(result, (frozenset(['AMB', 'MMDH']), frozenset(['qa testing'])))
+
+    def test_local_status_filter_intersects_repeated_clauses(self):
+        self.assertEqual(self.board.local_status_filter('status = "QA" AND status = "Dev"'), (None, frozenset()))
+        self.assertEqual(self.board.local_status_filter('status in (QA, Dev) AND status = Dev'), (None, frozenset(['dev'])))
+        self.assertEqual(self.board.local_status_filter('project = AMB AND project in (AMB, MMDH) AND status = QA'),
+                         (frozenset(['AMB']), frozenset(['qa'])))
+
+    def test_local_status_filter_quoted_comma(self):
+        self.assertEqual(self.board.local_status_filter('status in ("Ready, Set", Go)'), (None, frozenset(['ready, set', 'go'])))
+
+    """
+    negative tests for local_status_filter
+    """
+    def test_local_status_filter_status_id(self):
+        self.assertIsNone(self.board.local_status_filter('project = AMB AND status = 10001'))
+        self.assertIsNone(self.board.local_status_filter('status in ("QA Testing", "10002")'))
+
+    def test_local_status_filter_project_id_or_name(self):
+        self.assertIsNone(self.board.local_status_filter('project = 10200 AND status = QA'))
+        self.assertIsNone(self.board.local_status_filter('project = "MedHub Development" AND status = QA'))
+
+    def test_local_status_filter_other_clauses(self):
+        self.assertIsNone(self.board.local_status_filter('status = QA AND labels = hotfix'))
+        self.assertIsNone(self.board.local_status_filter('status = QA OR status = Dev'))
+        self.assertIsNone(self.board.local_status_filter('status CHANGED TO QA'))
+        self.assertIsNone(self.board.local_status_filter('project = AMB'))
+
+    """
+    positive tests for get_sprint_tags
+    """
+    def test_get_sprint_tags_scopes_to_project(self):
+        def story(key, status):
+            return {'key': key, 'fields': {'status': {'name': status, 'statusCategory': {'name': 'In Progress'}},
+                                           'issuetype': {'name': 'Story'}}}
+
+        sprint = [story('AMB-1', 'QA Testing'), story('MMDH-2', 'QA Testing'), story('AMB-3', 'Done')]
+        self.board.done_horizon_days = 0
+        self.board.iter_sprint_issues = mock.Mock(return_value=iter(sprint))
+        self.board.iter_keys = mock.Mock(side_effect=lambda keys, **kwargs: iter([story(key, 'QA Testing') for key in keys]))
+        self.board.get_filter_jql = lambda filter_id, exclude_types=None: 'project = AMB AND status = "QA Testing"'
+
+        tags, issues = self.board.get_sprint_tags([7])
+        self.assertEqual(tags, {'AMB-1': {7}})
+        self.assertEqual(list(issues), ['AMB-1'])
+        self.board.iter_sprint_issues.assert_called_once()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from util import (
+    parse_jira_date,
+    format_jira_date,
+    iter_json_records
+)
+
+from unittest import TestCase
+import tempfile
+import gzip
+import json
+import os
+
+
+class TestJiraUtil(TestCase):
+
+    """
+    positive tests for parse_jira_date
+    """
+    def test_parse_jira_date_offset(self):
+        result = parse_jira_date("2020-03-12T14:02:11.000-0400")
+        self.assertEqual(result.strftime("%Y-%m-%d %H:%M:%S%z"), "2020-03-12 14:02:11-0400")
+
+    def test_parse_jira_date_fraction(self):
+        result = parse_jira_date("2020-03-12T14:02:11.5Z")
+        self.assertEqual(result.microsecond, 500000)
+        self.assertEqual(result.utcoffset().total_seconds(), 0)
+
+    def test_parse_jira_date_fallback(self):
+        result = parse_jira_date("Wed, 21 Oct 2015 07:28:00 GMT")
+        self.assertEqual(result.strftime("%Y-%m-%d %H:%M%z"), "2015-10-21 07:28+0000")
+
+    def test_format_jira_date(self):
+        self.assertEqual(format_jira_date("2020-03-12T14:02:11.000-0400"), "2020-03-12 14:02")
+
+    """
+    positive tests for iter_json_records
+    """
+    def test_iter_json_records_array(self):
+        records = [{"key": "MMDH-{}".format(i), "fields": {"summary": "a ] b"}} for i in range(50)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fixture.json")
+            with open(path, "w", encoding="utf-8") as fixture:
+                fixture.write(json.dumps(records, indent=2))
+
+            self.assertEqual(list(iter_json_records(path, chunk_size=64)), records)
+
+    def test_iter_json_records_ndjson_gzip(self):
+        records = [{"key": "MMDH-{}".format(i)} for i in range(50)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fixture.ndjson.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as fixture:
+                fixture.write("\n".join(json.dumps(r) for r in records))
+
+            self.assertEqual(list(iter_json_records(path, chunk_size=64)), records)
+
+    def test_iter_json_records_number_across_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fixture.json")
+            with open(path, "w", encoding="utf-8") as fixture:
+                fixture.write("[1234567, 2, 3]")
+
+            self.assertEqual(list(iter_json_records(path, chunk_size=4)), [1234567, 2, 3])
+
+    """
+    negative tests for iter_json_records
+    """
+    def test_iter_json_records_truncated_array(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fixture.json")
+            with open(path, "w", encoding="utf-8") as fixture:
+                fixture.write('[{"key": "MMDH-1"}, {"key": "MM')
+
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_records(path, chunk_size=8))
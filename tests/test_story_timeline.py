@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from src.story_timeline import StoryTimeline
+
+from unittest import TestCase
+
+
+TESTERS = frozenset(["Tess Tester", "557058:tess"])
+
+
+def history(history_id, created, author, from_string, to_string, account_id=None, field="status"):
+    author_record = {"displayName": author}
+    if account_id is not None:
+        author_record["accountId"] = account_id
+    return {
+        "id": str(history_id),
+        "created": created,
+        "author": author_record,
+        "items": [{"field": field, "fromString": from_string, "toString": to_string}]
+    }
+
+
+def issue(status, category, histories):
+    return {
+        "key": "MMDH-1",
+        "fields": {"status": {"name": status, "statusCategory": {"name": category}}},
+        "changelog": {"histories": histories}
+    }
+
+
+def old_statuses(raw_issue):
+    """Status changes newest first, the way JiraBoard.get_statuses and get_parsed_stories used to build them."""
+    histories = sorted(raw_issue["changelog"]["histories"], key=lambda h: h["created"], reverse=True)
+    return [dict(
+        authorName  = h["author"]["displayName"],
+        created     = h["created"],
+        fromString  = h["items"][0]["fromString"],
+        toString    = h["items"][0]["toString"]
+    ) for h in histories if h["items"][0]["field"].lower() == "status"]
+
+
+def old_has_failed_qa(raw_issue, testers):
+    return next(filter(lambda s: s["authorName"] in testers and s["fromString"] == "QA Testing"
+                       and s["toString"] == "In Progress", old_statuses(raw_issue)), None) is not None
+
+
+def old_for_qa_team(raw_issue, testers):
+    return next(filter(lambda s: s["authorName"] in testers and "qa release" in s["fromString"].lower()
+                       and "qa testing" in s["toString"].lower(), old_statuses(raw_issue)), None) is not None
+
+
+def old_tested_by(raw_issue, testers):
+    tester = next(filter(lambda s: s["authorName"] in testers, old_statuses(raw_issue)), None)
+    return tester["authorName"] if tester is not None else "unassigned"
+
+
+def old_qa_ready_date(raw_issue):
+    status = next(filter(lambda s: s["fromString"] == "In Progress" and s["toString"] == "Ready for QA Release",
+                         old_statuses(raw_issue)), None)
+    return status["created"] if status is not None else None
+
+
+def old_has_qa_statuses(raw_issue):
+    return len([s for s in old_statuses(raw_issue) if s["fromString"] == "QA Testing" or s["toString"] == "QA Testing"]) > 0
+
+
+class TestStoryTimeline(TestCase):
+
+    def setUp(self):
+        # out of order on purpose, the timeline has to sort them newest first
+        self.bounced = issue("Ready for QA Release", "In Progress", [
+            history(3, "2020-01-03T09:00:00.000+0000", "Tess Tester", "Ready for QA Release", "QA Testing"),
+            history(1, "2020-01-01T09:00:00.000+0000", "Dev", "Backlog", "In Progress"),
+            history(6, "2020-01-06T09:00:00.000+0000", "Dev", "In Progress", "Ready for QA Release"),
+            history(2, "2020-01-02T09:00:00.000+0000", "Dev", "In Progress", "Ready for QA Release"),
+            history(4, "2020-01-04T09:00:00.000+0000", "Tess Tester", "QA Testing", "In Progress"),
+            history(5, "2020-01-05T09:00:00.000+0000", "Dev", "", "hotfix", field="labels"),
+        ])
+        self.done = issue("Done", "Done", [
+            history(1, "2020-01-01T09:00:00.000+0000", "Dev", "In Progress", "Ready for QA Release"),
+            history(2, "2020-01-02T09:00:00.000+0000", "Other Tester", "Ready for QA Release", "QA Testing"),
+            history(3, "2020-01-03T09:00:00.000+0000", "Tess Tester", "QA Testing", "Done"),
+        ])
+        self.untested = issue("Ready for QA Release", "In Progress", [
+            history(1, "2020-01-01T09:00:00.000+0000", "Dev", "In Progress", "Ready for QA Release"),
+        ])
+
+    """
+    positive tests for StoryTimeline against the old per-predicate checks
+    """
+    def test_matches_old_predicates(self):
+        for raw_issue in (self.bounced, self.done, self.untested):
+            timeline = StoryTimeline(raw_issue, TESTERS)
+            self.assertEqual(timeline.has_failed_qa, old_has_failed_qa(raw_issue, TESTERS))
+            self.assertEqual(timeline.for_qa_team, old_for_qa_team(raw_issue, TESTERS))
+            self.assertEqual(timeline.tested_by, old_tested_by(raw_issue, TESTERS))
+            self.assertEqual(timeline.qa_ready_date, old_qa_ready_date(raw_issue))
+            self.assertEqual(timeline.has_qa_statuses, old_has_qa_statuses(raw_issue))
+            self.assertEqual(timeline.statuses, old_statuses(raw_issue))
+
+    def test_walks_newest_first(self):
+        timeline = StoryTimeline(self.bounced, TESTERS)
+        self.assertEqual(timeline.qa_ready_date, "2020-01-06T09:00:00.000+0000")
+        self.assertEqual(timeline.statuses[0]["created"], "2020-01-06T09:00:00.000+0000")
+        self.assertEqual(len(timeline.statuses), 5)
+
+    def test_failure_count(self):
+        raw_issue = issue("In Progress", "In Progress", self.bounced["changelog"]["histories"] + [
+            history(7, "2020-01-07T09:00:00.000+0000", "Tess Tester", "Ready for QA Release", "QA Testing"),
+            history(8, "2020-01-08T09:00:00.000+0000", "Tess Tester", "QA Testing", "In Progress"),
+            history(9, "2020-01-09T09:00:00.000+0000", "Dev", "QA Testing", "In Progress"),
+        ])
+        timeline = StoryTimeline(raw_issue, TESTERS)
+        self.assertEqual(timeline.failure_count, 2)
+        self.assertTrue(timeline.is_currently_failed)
+
+    def test_qa_ready_flags(self):
+        self.assertTrue(StoryTimeline(self.bounced, TESTERS).is_stale_qa_ready)
+        self.assertFalse(StoryTimeline(self.bounced, TESTERS).is_fresh_qa_ready)
+        self.assertTrue(StoryTimeline(self.untested, TESTERS).is_fresh_qa_ready)
+        self.assertFalse(StoryTimeline(self.untested, TESTERS).is_stale_qa_ready)
+
+    def test_passed_qa(self):
+        timeline = StoryTimeline(self.done, TESTERS)
+        self.assertTrue(timeline.has_complete_status)
+        self.assertTrue(timeline.passed_qa)
+        self.assertEqual(timeline.tested_by, "Tess Tester")
+        # the tester didn't move it out of QA release, someone else did
+        self.assertFalse(timeline.for_qa_team)
+
+    def test_tester_matched_by_account_id(self):
+        raw_issue = issue("QA Testing", "In Progress", [
+            history(1, "2020-01-01T09:00:00.000+0000", "Dev", "In Progress", "Ready for QA Release"),
+            history(2, "2020-01-02T09:00:00.000+0000", "Renamed Tess", "Ready for QA Release", "QA Testing", account_id="557058:tess"),
+        ])
+        timeline = StoryTimeline(raw_issue, TESTERS)
+        self.assertTrue(timeline.for_qa_team)
+        self.assertTrue(timeline.is_in_qa_testing)
+        self.assertEqual(timeline.tested_by, "Renamed Tess")
+
+    """
+    negative tests for StoryTimeline
+    """
+    def test_no_testers(self):
+        timeline = StoryTimeline(self.bounced, frozenset())
+        self.assertFalse(timeline.has_failed_qa)
+        self.assertFalse(timeline.for_qa_team)
+        self.assertEqual(timeline.tested_by, "unassigned")
+        self.assertTrue(timeline.has_qa_statuses)
+
+    def test_passed_qa_untested(self):
+        raw_issue = issue("Done", "Done", [
+            history(1, "2020-01-01T09:00:00.000+0000", "Dev", "In Progress", "Done"),
+        ])
+        timeline = StoryTimeline(raw_issue, TESTERS)
+        self.assertTrue(timeline.has_complete_status)
+        self.assertFalse(timeline.passed_qa)
+        self.assertIsNone(timeline.qa_ready_date)
@@ -4,8 +4,19 @@ from argparse import ArgumentParser, ArgumentError
 from configparser import ConfigParser, ParsingError
 from src.exceptions import DbException
 from sqlite3 import connect, Error
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterator
+import dateutil.parser
+import gzip
+import json
 import sys
 import os
+import re
+
+
+# Jira's timestamp format, e.g. 2020-03-12T14:02:11.000-0400
+JIRA_TIMESTAMP = re.compile(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6}))?(Z|[+-]\d\d:?\d\d)?$')
 
 
 def get_cli_args() -> ArgumentParser:
@@ -31,6 +42,109 @@ def get_cli_args() -> ArgumentParser:
         return parser
 
 
+@lru_cache(maxsize=None)
+def _utc_offset(offset: str or None) -> timezone or None:
+    """Get the tzinfo for the offset part of a Jira timestamp.
+
+    :param offset: 'Z', '+HHMM', '+HH:MM' or None
+    :return: a timezone, otherwise None for a naive timestamp
+    """
+    if offset is None:
+        return None
+    if offset == 'Z':
+        return timezone.utc
+    sign = -1 if offset[0] == '-' else 1
+    digits = offset[1:].replace(':', '')
+    return timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+
+@lru_cache(maxsize=65536)
+def parse_jira_date(value: str) -> datetime:
+    """Parse a Jira timestamp into a datetime, memoized by the raw string.
+
+    Jira's fixed format is matched directly. Anything else falls back to dateutil.
+
+    :param value: timestamp string, e.g. '2020-03-12T14:02:11.000-0400'
+    :return: datetime
+    """
+    match = JIRA_TIMESTAMP.match(value)
+    if match is None:
+        return dateutil.parser.parse(value)
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                    int(fraction.ljust(6, '0')) if fraction else 0, _utc_offset(offset))
+
+
+@lru_cache(maxsize=65536)
+def format_jira_date(value: str, fmt: str = '%Y-%m-%d %H:%M') -> str:
+    """Reformat a Jira timestamp, memoized by the raw string and format.
+
+    :param value: timestamp string
+    :param fmt: strftime format
+    :return: formatted date string
+    """
+    return parse_jira_date(value).strftime(fmt)
+
+
+def iter_json_records(path: str, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Stream the records of a JSON fixture without loading the whole file.
+
+    The file may hold a JSON array, which is decoded one element at a time, or one JSON object per line. Files ending in
+    .gz are decompressed on the fly.
+
+    :param path: path to the fixture file
+    :param chunk_size: number of characters to read at a time
+    :return: a generator of decoded records
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    decoder = json.JSONDecoder()
+
+    with opener(path, 'rt', encoding='utf-8') as fixture:
+        buffer = ''
+        while buffer == '':
+            chunk = fixture.read(chunk_size)
+            if not chunk:
+                return
+            buffer = chunk.lstrip()
+        if not buffer.startswith('['):
+            # newline-delimited JSON
+            lines = buffer.split('\n')
+            buffer = lines.pop()
+            while True:
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+                chunk = fixture.read(chunk_size)
+                if not chunk:
+                    break
+                lines = (buffer + chunk).split('\n')
+                buffer = lines.pop()
+            if buffer.strip():
+                yield json.loads(buffer)
+            return
+
+        buffer = buffer[1:]
+        eof = False
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            # a number cut off at the end of the buffer still decodes, so only trust a record with data after it
+            if end is None or (end == len(buffer) and not eof):
+                chunk = fixture.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield record
+            buffer = buffer[end:]
+
+
 def get_configs(fields: list, config_path: str) -> dict:
     """parse a config.ini file for specific keys
 
@@ -147,3 +261,24 @@ def gitlab_db_setup(db_path: str) -> None:
         connection.close()
     except Error as sqle:
         raise (sqle, "Database operation failed")
+
+
+def jira_db_setup(db_path: str) -> None:
+    """Set up the Jira issue store tables next to the commits table."""
+    if not db_path or db_path is None:
+        raise DbException("Database path required for this operation")
+
+    connection      = connect(db_path)
+    cursor          = connection.cursor()
+
+    create_tables   = [
+        "CREATE TABLE IF NOT EXISTS jira_issues (issue_key text PRIMARY KEY, issue_id text, updated text, raw text )"
+    ]
+
+    try:
+        for create_table in create_tables:
+            cursor.execute(create_table)
+        connection.commit()
+        connection.close()
+    except Error as sqle:
+        raise (sqle, "Database operation failed")